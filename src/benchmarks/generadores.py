@@ -0,0 +1,185 @@
+'''
+Generadores de ficheros sintéticos para pruebas de carga, en los mismos
+formatos que leen Red_social.parse, RedGenica.parse y palabrasMasComunes.
+
+Las líneas se producen y escriben de una en una, así que la memoria no depende
+del número de filas (de 10^3 a 10^8). Con la misma semilla se obtiene siempre
+el mismo fichero. Los extremos de las aristas siguen una ley de potencias: el
+vértice de rango k aparece con frecuencia proporcional a k^-exponente.
+
+    python -m benchmarks.generadores red_social resources --usuarios 100000
+    python -m benchmarks.generadores red_genica . --genes 10000 --semilla 3
+    python -m benchmarks.generadores corpus corpus.txt --palabras 1000000
+'''
+
+from __future__ import annotations
+from datetime import date
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+import argparse
+import os
+import random
+
+LETRAS_DNI = "TRWAGMYFPDXBNJZSQVHLCKE"
+MAX_USUARIOS = 10 ** 8 #Hay 10^8 números de DNI distintos
+EXPONENTE: float = 0.8
+NOMBRES = ("Ana", "Carlos", "David", "Elena", "Jorge", "Juan", "Laura", "Lucia", "Maria", "Pedro", "Sara", "Pablo")
+APELLIDOS = ("Garcia", "Lopez", "Martinez", "Sanchez", "Perez", "Gomez", "Ruiz", "Diaz", "Moreno", "Romero")
+TIPOS_GEN = ("supresor tumoral", "oncogen", "reparador de ADN", "regulador")
+CROMOSOMAS = tuple(str(i) for i in range(1, 23)) + ("X", "Y")
+_PRIMERA_FECHA = date(1940, 1, 1).toordinal()
+_ULTIMA_FECHA = date(2005, 12, 31).toordinal()
+
+#UTILIDADES
+def _aleatorio(semilla: int, fichero: str) -> random.Random:
+    # Un generador independiente por fichero: cambiar uno no altera los demás
+    return random.Random(f"{semilla}:{fichero}")
+
+def dni(indice: int) -> str:
+    '''
+    DNI válido del usuario número indice. La función es una biyección de
+    [0, 10^8) en sí mismo (multiplicar por un número primo con 10^8), así que
+    los DNI no se repiten y no hace falta guardarlos para generar relaciones.
+    '''
+    if not 0 <= indice < MAX_USUARIOS:
+        raise ValueError(f"El índice debe estar entre 0 y {MAX_USUARIOS - 1}")
+    numero = (indice * 48271 + 12345678) % MAX_USUARIOS
+    return f"{numero:08d}{LETRAS_DNI[numero % 23]}"
+
+def indice_potencia(aleatorio: random.Random, n: int, exponente: float = EXPONENTE) -> int:
+    # Si u es uniforme, n * u^(1 / (1 - a)) da al índice k una frecuencia proporcional a k^-a
+    if not 0 <= exponente < 1:
+        raise ValueError("El exponente debe estar en [0, 1)")
+    return min(n - 1, int(n * aleatorio.random() ** (1 / (1 - exponente))))
+
+def _par(aleatorio: random.Random, n: int, exponente: float) -> Tuple[int, int]:
+    # Extremos de una arista sin lazos
+    origen = indice_potencia(aleatorio, n, exponente)
+    destino = indice_potencia(aleatorio, n, exponente)
+    while destino == origen and n > 1:
+        destino = indice_potencia(aleatorio, n, exponente)
+    return origen, destino
+
+def escribir(ruta: str, lineas: Iterable[str]) -> str:
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(lineas)
+    return ruta
+
+#RED SOCIAL
+def lineas_usuarios(n: int, semilla: int = 0) -> Iterator[str]:
+    if not 0 < n <= MAX_USUARIOS:
+        raise ValueError(f"El número de usuarios debe estar entre 1 y {MAX_USUARIOS}")
+    aleatorio = _aleatorio(semilla, "usuarios")
+    for i in range(n):
+        fecha = date.fromordinal(aleatorio.randint(_PRIMERA_FECHA, _ULTIMA_FECHA))
+        yield f"{dni(i)},{aleatorio.choice(NOMBRES)},{aleatorio.choice(APELLIDOS)},{fecha.isoformat()}\n"
+
+def lineas_relaciones(usuarios: int, relaciones: int, semilla: int = 0,
+                      exponente: float = EXPONENTE) -> Iterator[str]:
+    aleatorio = _aleatorio(semilla, "relaciones")
+    for _ in range(relaciones):
+        origen, destino = _par(aleatorio, usuarios, exponente)
+        yield f"{dni(origen)},{dni(destino)},{aleatorio.randint(1, 100)},{aleatorio.randint(1, 365)}\n"
+
+def red_social(directorio: str, usuarios: int, relaciones_por_usuario: float = 5, semilla: int = 0,
+               exponente: float = EXPONENTE, prefijo: str = "") -> Tuple[str, str]:
+    # Escribe <prefijo>usuarios.txt y <prefijo>relaciones.txt y devuelve sus rutas
+    usuarios_file = escribir(os.path.join(directorio, f"{prefijo}usuarios.txt"), lineas_usuarios(usuarios, semilla))
+    relaciones_file = escribir(os.path.join(directorio, f"{prefijo}relaciones.txt"),
+                               lineas_relaciones(usuarios, int(usuarios * relaciones_por_usuario), semilla, exponente))
+    return usuarios_file, relaciones_file
+
+#RED GÉNICA
+def nombre_gen(indice: int) -> str:
+    return f"GEN{indice}"
+
+def lineas_genes(n: int, semilla: int = 0) -> Iterator[str]:
+    aleatorio = _aleatorio(semilla, "genes")
+    for i in range(n):
+        loc = f"{aleatorio.choice(CROMOSOMAS)}{aleatorio.choice('pq')}{aleatorio.randint(11, 36)}.{aleatorio.randint(1, 3)}"
+        yield f"{nombre_gen(i)},{aleatorio.choice(TIPOS_GEN)},{int(aleatorio.paretovariate(1.5)) - 1},{loc}\n"
+
+def lineas_red_genes(genes: int, aristas: int, semilla: int = 0, exponente: float = EXPONENTE) -> Iterator[str]:
+    aleatorio = _aleatorio(semilla, "red_genes")
+    for _ in range(aristas):
+        origen, destino = _par(aleatorio, genes, exponente)
+        yield f"{nombre_gen(origen)},{nombre_gen(destino)},{aleatorio.uniform(-1, 1):.3f}\n"
+
+def red_genica(directorio: str, genes: int, aristas_por_gen: float = 3, semilla: int = 0,
+               exponente: float = EXPONENTE, prefijo: str = "") -> Tuple[str, str]:
+    # Escribe <prefijo>genes.csv y <prefijo>red_genes.csv y devuelve sus rutas
+    genes_file = escribir(os.path.join(directorio, f"{prefijo}genes.csv"), lineas_genes(genes, semilla))
+    red_file = escribir(os.path.join(directorio, f"{prefijo}red_genes.csv"),
+                        lineas_red_genes(genes, int(genes * aristas_por_gen), semilla, exponente))
+    return genes_file, red_file
+
+#CORPUS
+def lineas_corpus(palabras: int, vocabulario: int = 50000, semilla: int = 0,
+                  exponente: float = EXPONENTE, por_linea: int = 100) -> Iterator[str]:
+    # Palabras con frecuencias de tipo Zipf (la palabra de rango k, proporcional a k^-exponente)
+    aleatorio = _aleatorio(semilla, "corpus")
+    for inicio in range(0, palabras, por_linea):
+        linea = ' '.join(f"palabra{indice_potencia(aleatorio, vocabulario, exponente)}"
+                         for _ in range(min(por_linea, palabras - inicio)))
+        yield linea + '.\n'
+
+def corpus(ruta: str, palabras: int, vocabulario: int = 50000, semilla: int = 0,
+           exponente: float = EXPONENTE) -> str:
+    return escribir(ruta, lineas_corpus(palabras, vocabulario, semilla, exponente))
+
+#LÍNEA DE ÓRDENES
+def main(argumentos: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generador de ficheros sintéticos")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--exponente", type=float, default=EXPONENTE)
+    tipos = parser.add_subparsers(dest="tipo", required=True)
+    social = tipos.add_parser("red_social", help="usuarios.txt y relaciones.txt")
+    social.add_argument("directorio")
+    social.add_argument("--usuarios", type=int, default=1000)
+    social.add_argument("--relaciones-por-usuario", type=float, default=5)
+    genica = tipos.add_parser("red_genica", help="genes.csv y red_genes.csv")
+    genica.add_argument("directorio")
+    genica.add_argument("--genes", type=int, default=1000)
+    genica.add_argument("--aristas-por-gen", type=float, default=3)
+    texto = tipos.add_parser("corpus", help="fichero de texto")
+    texto.add_argument("ruta")
+    texto.add_argument("--palabras", type=int, default=100000)
+    texto.add_argument("--vocabulario", type=int, default=50000)
+    args = parser.parse_args(argumentos)
+
+    if args.tipo == "red_social":
+        rutas = red_social(args.directorio, args.usuarios, args.relaciones_por_usuario, args.semilla, args.exponente)
+    elif args.tipo == "red_genica":
+        rutas = red_genica(args.directorio, args.genes, args.aristas_por_gen, args.semilla, args.exponente)
+    else:
+        rutas = (corpus(args.ruta, args.palabras, args.vocabulario, args.semilla, args.exponente),)
+    for ruta in rutas:
+        print(ruta)
+
+#PRUEBAS
+def test_generadores():
+    import tempfile
+    from collections import Counter
+    from entrega3.ENTREGA3 import Red_social, _error_dni
+    from examen3 import RedGenica
+    print("Pruebas de los generadores")
+    assert len({dni(i) for i in range(100000)}) == 100000
+    assert all(_error_dni(dni(i)) is None and dni(i)[8] == LETRAS_DNI[int(dni(i)[:8]) % 23] for i in range(1000))
+    assert list(lineas_relaciones(100, 50, semilla=7)) == list(lineas_relaciones(100, 50, semilla=7))
+    assert list(lineas_relaciones(100, 50, semilla=7)) != list(lineas_relaciones(100, 50, semilla=8))
+    aleatorio = random.Random(0)
+    frecuencias = Counter(indice_potencia(aleatorio, 1000) for _ in range(100000))
+    assert frecuencias[0] > frecuencias[10] > frecuencias[500]
+    with tempfile.TemporaryDirectory() as directorio:
+        red = Red_social.parse(*red_social(directorio, 500, semilla=1))
+        assert len(red.vertices()) == 500 and not red.rechazados
+        genica = RedGenica.parse(*red_genica(directorio, 200, semilla=1))
+        assert len(genica.genes_por_nombre) == 200
+        with open(corpus(os.path.join(directorio, "corpus.txt"), 1050), encoding='utf-8') as f:
+            assert sum(len(linea.split()) for linea in f) == 1050
+    print("Todas las pruebas de los generadores han pasado.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+'''
+Suite de benchmarks de los agregados, el grafo, los recorridos y los cargadores.
+
+Cada benchmark prepara sus datos sintéticos (ver benchmarks.generadores) una vez (fuera del tiempo medido) y
+se repite varias veces; se guarda la mediana en segundos. Los resultados se
+pueden guardar en JSON y compararse con una línea base guardada antes, marcando
+como regresión todo lo que sea más lento que la base por encima de la tolerancia.
+
+    python -m benchmarks.suite --tamanos 1000 10000 --guardar base.json
+    python -m benchmarks.suite --comparar base.json
+
+benchmarks/base.json (BASE) es la línea base guardada en el repositorio, con la
+versión de Python y la plataforma en las que se midió: los tiempos solo son
+comparables en una máquina parecida; si no, se guarda una base propia antes.
+'''
+
+from __future__ import annotations
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+
+from entrega2.tipos import ColaPrioridad, ListaOrdenada
+from entrega3.ENTREGA3 import (Grafo, Red_social, RecorridoAnchura, RecorridoDijkstra,
+                               RecorridoProfundidad)
+from examen1 import palabrasMasComunes
+from examen3 import RedGenica
+from benchmarks import generadores
+from benchmarks.generadores import indice_potencia
+
+BASE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "base.json")
+TAMANOS: Tuple[int, ...] = (1000, 10000)
+REPETICIONES: int = 3
+TOLERANCIA: float = 0.25 #Una medida es regresión si tarda más de base * (1 + TOLERANCIA)
+
+#DATOS SINTÉTICOS
+def grafo_aleatorio(n: int, aristas_por_vertice: int = 5, semilla: int = 0) -> Grafo[int, float]:
+    # Grafo dirigido en memoria con extremos según la misma ley de potencias que los ficheros generados
+    aleatorio = random.Random(semilla)
+    return Grafo.from_edges(((indice_potencia(aleatorio, n), indice_potencia(aleatorio, n), aleatorio.uniform(1, 10))
+                             for _ in range(n * aristas_por_vertice)), es_dirigido=True)
+
+#BENCHMARKS
+# Cada benchmark recibe el tamaño y un directorio temporal, prepara los datos y
+# devuelve la función sin argumentos cuyo tiempo se mide
+Preparacion = Callable[[int, str], Callable[[], Any]]
+
+def _cola_prioridad(n: int, directorio: str) -> Callable[[], Any]:
+    aleatorio = random.Random(n)
+    prioridades = [aleatorio.random() for _ in range(n)]
+    def ejecutar():
+        cola = ColaPrioridad.of()
+        for i, prioridad in enumerate(prioridades):
+            cola.add(i, prioridad)
+        for i in range(0, n, 10):
+            cola.decrease_priority(i, -1.0)
+        return cola.remove_all()
+    return ejecutar
+
+def _lista_ordenada(n: int, directorio: str) -> Callable[[], Any]:
+    aleatorio = random.Random(n)
+    valores = [aleatorio.random() for _ in range(n)]
+    def ejecutar():
+        lista = ListaOrdenada.of(lambda x: x)
+        lista.add_all(valores)
+        return lista.remove_all()
+    return ejecutar
+
+def _predecessors(n: int, directorio: str) -> Callable[[], Any]:
+    grafo = grafo_aleatorio(n)
+    vertices = list(range(0, n, max(1, n // 100)))
+    return lambda: [grafo.predecessors(v) for v in vertices]
+
+def _subgraph(n: int, directorio: str) -> Callable[[], Any]:
+    grafo = grafo_aleatorio(n)
+    mitad = set(range(0, n, 2))
+    return lambda: grafo.subgraph(mitad)
+
+def _recorrido(estrategia: type) -> Preparacion:
+    def preparar(n: int, directorio: str) -> Callable[[], Any]:
+        grafo = grafo_aleatorio(n)
+        return lambda: estrategia.of(grafo).traverse(0)
+    return preparar
+
+def _red_social_parse(n: int, directorio: str) -> Callable[[], Any]:
+    usuarios_file, relaciones_file = generadores.red_social(directorio, n, prefijo=f"{n}_")
+    return lambda: Red_social.parse(usuarios_file, relaciones_file)
+
+def _red_genica_parse(n: int, directorio: str) -> Callable[[], Any]:
+    genes_file, red_file = generadores.red_genica(directorio, n, prefijo=f"{n}_")
+    return lambda: RedGenica.parse(genes_file, red_file)
+
+def _palabras_mas_comunes(n: int, directorio: str) -> Callable[[], Any]:
+    ruta = generadores.corpus(os.path.join(directorio, f"{n}_corpus.txt"), n * 100)
+    return lambda: palabrasMasComunes(ruta, 10)
+
+BENCHMARKS: Dict[str, Preparacion] = {
+    "cola_prioridad": _cola_prioridad,
+    "lista_ordenada": _lista_ordenada,
+    "grafo.predecessors": _predecessors,
+    "grafo.subgraph": _subgraph,
+    "recorrido.profundidad": _recorrido(RecorridoProfundidad),
+    "recorrido.anchura": _recorrido(RecorridoAnchura),
+    "recorrido.dijkstra": _recorrido(RecorridoDijkstra),
+    "red_social.parse": _red_social_parse,
+    "red_genica.parse": _red_genica_parse,
+    "palabras_mas_comunes": _palabras_mas_comunes,
+}
+
+#MEDICIÓN
+def medir(funcion: Callable[[], Any], repeticiones: int = REPETICIONES) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = perf_counter()
+        funcion()
+        tiempos.append(perf_counter() - inicio)
+    return median(tiempos)
+
+def ejecutar(tamanos: Sequence[int] = TAMANOS, nombres: Optional[Sequence[str]] = None,
+             repeticiones: int = REPETICIONES) -> Dict[str, Dict[str, float]]:
+    '''
+    Devuelve {benchmark: {tamaño: segundos}}. Los tamaños son cadenas para que
+    el resultado sea igual al que se lee de un JSON guardado.
+    '''
+    resultados: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre in nombres or BENCHMARKS:
+            resultados[nombre] = {}
+            for n in tamanos:
+                resultados[nombre][str(n)] = medir(BENCHMARKS[nombre](n, directorio), repeticiones)
+    return resultados
+
+def guardar(resultados: Dict[str, Dict[str, float]], fichero: str) -> None:
+    documento = {
+        "fecha": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+    with open(fichero, 'w', encoding='utf-8') as f:
+        json.dump(documento, f, indent=2)
+
+def cargar(fichero: str) -> Dict[str, Dict[str, float]]:
+    with open(fichero, 'r', encoding='utf-8') as f:
+        return json.load(f)["resultados"]
+
+def regresiones(resultados: Dict[str, Dict[str, float]], base: Dict[str, Dict[str, float]],
+                tolerancia: float = TOLERANCIA) -> List[Tuple[str, str, float, float]]:
+    # (benchmark, tamaño, base, actual) de cada medida más lenta que la base más la tolerancia
+    lentas = []
+    for nombre, por_tamano in resultados.items():
+        for n, tiempo in por_tamano.items():
+            anterior = base.get(nombre, {}).get(n)
+            if anterior is not None and tiempo > anterior * (1 + tolerancia):
+                lentas.append((nombre, n, anterior, tiempo))
+    return lentas
+
+def _tabla(resultados: Dict[str, Dict[str, float]], base: Optional[Dict[str, Dict[str, float]]]) -> str:
+    lineas = []
+    for nombre, por_tamano in resultados.items():
+        for n, tiempo in por_tamano.items():
+            linea = f"{nombre:<24}{n:>10}{tiempo * 1000:>12.2f} ms"
+            anterior = (base or {}).get(nombre, {}).get(n)
+            if anterior:
+                linea += f"  (x{tiempo / anterior:.2f} respecto a la base)"
+            lineas.append(linea)
+    return "\n".join(lineas)
+
+def main(argumentos: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Suite de benchmarks")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--solo", nargs="+", choices=list(BENCHMARKS), help="benchmarks a ejecutar")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--guardar", help="fichero JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="fichero JSON con la línea base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args(argumentos)
+
+    resultados = ejecutar(args.tamanos, args.solo, args.repeticiones)
+    base = cargar(args.comparar) if args.comparar else None
+    print(_tabla(resultados, base))
+    if args.guardar:
+        guardar(resultados, args.guardar)
+    if base is not None:
+        lentas = regresiones(resultados, base, args.tolerancia)
+        for nombre, n, anterior, tiempo in lentas:
+            print(f"REGRESIÓN {nombre} [{n}]: {anterior * 1000:.2f} ms -> {tiempo * 1000:.2f} ms")
+        return 1 if lentas else 0
+    return 0
+
+#PRUEBAS
+def test_suite():
+    print("Pruebas de la suite de benchmarks")
+    resultados = ejecutar(tamanos=(50,), repeticiones=1)
+    assert set(resultados) == set(BENCHMARKS)
+    assert all(tiempo >= 0 for por_tamano in resultados.values() for tiempo in por_tamano.values())
+    with tempfile.TemporaryDirectory() as directorio:
+        fichero = os.path.join(directorio, "base.json")
+        guardar(resultados, fichero)
+        assert cargar(fichero) == resultados
+    base = {"cola_prioridad": {"50": 1.0}, "grafo.subgraph": {"50": 1.0}}
+    actual = {"cola_prioridad": {"50": 1.2}, "grafo.subgraph": {"50": 1.3}, "nuevo": {"50": 5.0}}
+    assert regresiones(actual, base, 0.25) == [("grafo.subgraph", "50", 1.0, 1.3)]
+    assert set(cargar(BASE)) == set(BENCHMARKS) #La base del repositorio cubre todos los benchmarks
+    print(_tabla(resultados, None))
+    print("Todas las pruebas de la suite han pasado.")
+
+if __name__ == '__main__':
+    sys.exit(main())
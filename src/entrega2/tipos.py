@@ -1,6 +1,15 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Callable, TypeVar, Generic, List, Tuple
+from typing import Callable, TypeVar, Generic, List, Tuple, Iterator, TextIO
+import os
+import sys
+
+if __package__ in (None, ''):
+    # Ejecutado como script (python tipos.py): src tiene que estar en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentacion
+from representacion import resumen
 
 E = TypeVar('E')
 #AGREGADO LINEAL
@@ -37,6 +46,17 @@ class AgregadoLineal(ABC, Generic[E]):
         while not self.is_empty:
             removed_elements.append(self.remove())
         return removed_elements
+
+    def _textos(self) -> Iterator[str]:
+        return (str(e) for e in self._elements)
+
+    def _resumen(self) -> str:
+        return resumen(self._textos(), self.size)
+
+    def write_to(self, fh: TextIO) -> None:
+        for texto in self._textos():
+            fh.write(texto)
+            fh.write("\n")
     
 
 R = TypeVar('R')
@@ -61,8 +81,7 @@ class ListaOrdenada(AgregadoLineal[E], Generic[E, R]):
         self._elements.insert(index, e)
 
     def __repr__(self) -> str:
-        elements_str = ", ".join(str(e) for e in self._elements)
-        return f"ListaOrdenada({elements_str})"
+        return f"ListaOrdenada({self._resumen()})"
 
 #LISTA ORDENADA SIN REPETICIÓN
 class ListaOrdenadaSinRepeticion(AgregadoLineal[E], Generic[E, R]):
@@ -86,8 +105,7 @@ class ListaOrdenadaSinRepeticion(AgregadoLineal[E], Generic[E, R]):
             self._elements.insert(index, e)
 
     def __repr__(self) -> str:
-        elements_str = ", ".join(str(e) for e in self._elements)
-        return f"ListaOrdenadaSinRepeticion({elements_str})"
+        return f"ListaOrdenadaSinRepeticion({self._resumen()})"
     
 #COLA
 class Cola(AgregadoLineal[E]):
@@ -99,8 +117,7 @@ class Cola(AgregadoLineal[E]):
         self._elements.append(e)
 
     def __repr__(self) -> str:
-        elements_str = ", ".join(str(e) for e in self._elements)
-        return f"Cola({elements_str})"
+        return f"Cola({self._resumen()})"
 
 
 #COLA DE PRIORIDAD
@@ -122,6 +139,8 @@ class ColaPrioridad(AgregadoLineal[E]):
         return len(self._priorities)
 
     def add(self, e: E, priority: P) -> None:
+        if instrumentacion.ACTIVA:
+            instrumentacion.incrementar("cola_prioridad.add")
         index = self._index_order(priority)
         self._elements.insert(index, e)
         self._priorities.insert(index, priority)
@@ -131,6 +150,8 @@ class ColaPrioridad(AgregadoLineal[E]):
             self.add(e, priority)
     def remove(self) -> E:
         assert len(self._elements) > 0, 'El agregado está vacío'
+        if instrumentacion.ACTIVA:
+            instrumentacion.incrementar("cola_prioridad.remove")
         self._priorities.pop(0)
         return super().remove()
 
@@ -141,6 +162,8 @@ class ColaPrioridad(AgregadoLineal[E]):
         return removed_elements
 
     def decrease_priority(self, e: E, new_priority: P) -> None:
+        if instrumentacion.ACTIVA:
+            instrumentacion.incrementar("cola_prioridad.decrease_priority")
         if e in self._elements:
             index = self._elements.index(e)
             current_priority = self._priorities[index]
@@ -149,9 +172,11 @@ class ColaPrioridad(AgregadoLineal[E]):
                 self._priorities.pop(index)
                 self.add(e, new_priority)
 
+    def _textos(self) -> Iterator[str]:
+        return (f"({e}, {p})" for e, p in zip(self._elements, self._priorities))
+
     def __repr__(self) -> str:
-        elements_str = ", ".join(f"({e}, {p})" for e, p in zip(self._elements, self._priorities))
-        return f"ColaPrioridad[{elements_str}]"
+        return f"ColaPrioridad[{self._resumen()}]"
     
 #PILA
 class Pila(AgregadoLineal[E]):
@@ -165,8 +190,7 @@ class Pila(AgregadoLineal[E]):
         self._elements.insert(0, e)
         
     def __repr__(self) -> str:
-        elements_str = ", ".join(str(e) for e in self._elements)
-        return f"Pila({elements_str})"
+        return f"Pila({self._resumen()})"
 
 # Test_Lista_ordenada.py
 
@@ -1,7 +1,25 @@
 from __future__ import annotations
-from typing import TypeVar, Generic, Dict, Set, Optional, Callable, Tuple, List, Any
+from typing import TypeVar, Generic, Dict, Set, Optional, Callable, Tuple, List, Any, Iterable, Iterator, TextIO
 from abc import ABC, abstractmethod
 from datetime import date, datetime
+from collections import deque
+from itertools import count, islice
+from math import inf
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock, local
+from time import perf_counter
+import heapq
+import os
+import re
+import sys
+
+if __package__ in (None, ''):
+    # Ejecutado como script (python ENTREGA3.py): src tiene que estar en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from representacion import MAX_REPR, resumen
+from texto.bloques import bloques_binarios, rangos_alineados
+import instrumentacion
 import matplotlib.pyplot as plt
 import networkx as nx
 
@@ -14,24 +32,68 @@ class Grafo(Generic[V, E]):
     def __init__(self, es_dirigido: bool = True):
         self.es_dirigido: bool = es_dirigido
         self.adyacencias: Dict[V, Dict[V, E]] = {}
+        self._version: int = 0 #Cambia con cada modificación; sirve para invalidar cachés
+        self._num_aristas: int = 0 #Se mantiene en add_edge y add_edges para no recorrer las adyacencias
     
     @staticmethod
     def of(es_dirigido: bool = True) -> Grafo[V, E]:
 
         return Grafo(es_dirigido)
+
+    @property
+    def version(self) -> int:
+        return self._version
     
     def add_vertex(self, vertice: V) -> None:
 
         if vertice not in self.adyacencias:
             self.adyacencias[vertice] = {}
+            self._version += 1
     
     def add_edge(self, origen: V, destino: V, arista: E) -> None:
         self.add_vertex(origen)
         self.add_vertex(destino)
+        self._version += 1
+        if destino not in self.adyacencias[origen]:
+            self._num_aristas += 1
         self.adyacencias[origen][destino] = arista
         if not self.es_dirigido:
             self.adyacencias[destino][origen] = arista
 
+    @classmethod
+    def from_edges(cls, aristas: Iterable[Tuple[V, V, E]], es_dirigido: bool = True) -> Grafo[V, E]:
+        grafo = cls(es_dirigido)
+        grafo.add_edges(aristas)
+        return grafo
+
+    def add_edges(self, aristas: Iterable[Tuple[V, V, E]]) -> None:
+        '''
+        Añade un lote de aristas (origen, destino, arista) escribiendo directamente en
+        las adyacencias, sin pasar por add_vertex ni add_edge en cada arista. El
+        resultado es el mismo que llamar a add_edge con cada una en orden.
+        '''
+        adyacencias = self.adyacencias
+        buscar = adyacencias.get
+        dirigido = self.es_dirigido
+        nuevas = 0
+        for origen, destino, arista in aristas:
+            destinos = buscar(origen)
+            if destinos is None:
+                destinos = adyacencias[origen] = {}
+            if destino not in destinos:
+                nuevas += 1
+            destinos[destino] = arista
+            if dirigido:
+                if destino not in adyacencias:
+                    adyacencias[destino] = {}
+            else:
+                destinos = buscar(destino)
+                if destinos is None:
+                    destinos = adyacencias[destino] = {}
+                destinos[origen] = arista
+        self._num_aristas += nuevas
+        self._version += 1
+
     def successors(self, vertice: V) -> Set[V]:
 
         return set(self.adyacencias.get(vertice, {}).keys())
@@ -51,23 +113,18 @@ class Grafo(Generic[V, E]):
         return destino in self.adyacencias.get(origen, {})
 
     def subgraph(self, vertices: Set[V]) -> Grafo[V, E]:
-        subgrafo = Grafo(self.es_dirigido)
-        for vertice in vertices:
-            if vertice in self.adyacencias:
-                for destino, arista in self.adyacencias[vertice].items():
-                    if destino in vertices:
-                        subgrafo.add_edge(vertice, destino, arista)
-        return subgrafo
+        return Grafo.from_edges(((vertice, destino, arista)
+                                 for vertice in vertices if vertice in self.adyacencias
+                                 for destino, arista in self.adyacencias[vertice].items()
+                                 if destino in vertices), self.es_dirigido)
 
     def inverse_graph(self) -> Grafo[V, E]:
 
         if not self.es_dirigido:
             raise ValueError("El grafo no es dirigido.")
-        grafo_inverso = Grafo(self.es_dirigido)
-        for origen in self.adyacencias:
-            for destino, arista in self.adyacencias[origen].items():
-                grafo_inverso.add_edge(destino, origen, arista)
-        return grafo_inverso
+        return Grafo.from_edges(((destino, origen, arista)
+                                 for origen, destinos in self.adyacencias.items()
+                                 for destino, arista in destinos.items()), self.es_dirigido)
 
     def draw(self, titulo: str = "Grafo", 
             lambda_vertice: Callable[[V], str] = str, 
@@ -89,34 +146,170 @@ class Grafo(Generic[V, E]):
         plt.title(titulo)
         plt.show()
 
+    def num_aristas(self) -> int:
+        # En un grafo no dirigido cada arista cuenta una vez (los lazos también)
+        return self._num_aristas
+
+    def _linea(self, origen: V, destinos: Dict[V, E], limite: Optional[int] = None) -> str:
+        conexiones = (f"{destino} ({peso})" for destino, peso in destinos.items())
+        return f"{origen} -> {resumen(conexiones, len(destinos), limite)}"
+
     def __str__(self) -> str:
+        # Solo los primeros MAX_REPR vértices y vecinos; write_to escribe el grafo completo
+        result = [self._linea(origen, destinos, MAX_REPR)
+                  for origen, destinos in islice(self.adyacencias.items(), MAX_REPR)]
+        if len(self.adyacencias) > MAX_REPR:
+            result.append(f"... ({len(self.adyacencias)} vértices, {self.num_aristas()} aristas)")
+        return "\n".join(result)
 
-        result = []
+    def write_to(self, fh: TextIO) -> None:
         for origen, destinos in self.adyacencias.items():
-            conexiones = ", ".join(f"{destino} ({peso})" for destino, peso in destinos.items())
-            result.append(f"{origen} -> {conexiones}")
-        return "\n".join(result)
+            fh.write(self._linea(origen, destinos))
+            fh.write("\n")
+
+#ÁRBOL COMPACTO
+class _ArbolCompacto(Generic[V]):
+    '''
+    El árbol de un recorrido en listas paralelas indexadas por entero: padre
+    (-1 en las raíces), coste y profundidad. La raíz de cada vértice se calcula
+    una vez para todos por saltos de punteros (raiz[i] = raiz[raiz[i]]).
+    '''
+    def __init__(self, tree: Dict[V, Tuple[Optional[V], float]]):
+        self.vertices: List[V] = list(tree)
+        self.indice: Dict[V, int] = {v: i for i, v in enumerate(self.vertices)}
+        indice = self.indice
+        n = len(self.vertices)
+        # Listas y no array('q'): leer de una lista no crea un int nuevo en cada acceso
+        self.padres: List[int] = [indice.get(tree[v][0], -1) if tree[v][0] is not None else -1
+                                  for v in self.vertices]
+        self.costes: List[float] = [tree[v][1] for v in self.vertices]
+        self.profundidades: List[int] = [-1] * n
+        padres, profundidades = self.padres, self.profundidades
+        for i in range(n):
+            pendientes = []
+            j = i
+            while j >= 0 and profundidades[j] < 0:
+                pendientes.append(j)
+                j = padres[j]
+            profundidad = profundidades[j] if j >= 0 else -1
+            for j in reversed(pendientes):
+                profundidad += 1
+                profundidades[j] = profundidad
+        self._raices: Optional[List[int]] = None
+
+    def camino(self, vertice: V) -> List[V]:
+        i = self.indice.get(vertice)
+        if i is None:
+            return [vertice]
+        k = self.profundidades[i]
+        camino: List[V] = [None] * (k + 1)
+        padres, vertices = self.padres, self.vertices
+        while i >= 0:
+            camino[k] = vertices[i]
+            i = padres[i]
+            k -= 1
+        return camino
+
+    def raiz(self, vertice: V) -> V:
+        i = self.indice.get(vertice)
+        if i is None:
+            return vertice
+        if self._raices is None:
+            raices = [p if p >= 0 else j for j, p in enumerate(self.padres)]
+            cambio = True
+            while cambio:
+                cambio = False
+                for j in range(len(raices)):
+                    siguiente = raices[raices[j]]
+                    if siguiente != raices[j]:
+                        raices[j] = siguiente
+                        cambio = True
+            self._raices = raices
+        return self.vertices[self._raices[i]]
 
 #RECORRIDO
+def peso_por_defecto(arista: Any) -> float:
+    # Las aristas numéricas son su propio peso; cualquier otra arista (p. ej. Relacion) pesa 1
+    return (arista or 1) if isinstance(arista, (int, float)) else 1
+
 class Recorrido(ABC, Generic[V, E]):
-    def __init__(self, grafo: Grafo[V, E]):
+    '''
+    Recorrido de un grafo desde un vértice. Cada estrategia implementa _recorrer
+    como un generador, así que se puede parar en cuanto se llega al destino, al
+    cumplirse un predicado o a una profundidad máxima, y el árbol y el camino solo
+    se guardan si se pide.
+    '''
+    def __init__(self, grafo: Grafo[V, E], peso: Callable[[E], float] = peso_por_defecto):
         self._tree: Dict[V, Tuple[Optional[V], float]] = {}
         self._path: List[V] = []
         self._grafo: Grafo[V, E] = grafo
+        self._peso: Callable[[E], float] = peso
+        self._terminado: bool = False
+        self._compacto: Optional[_ArbolCompacto[V]] = None
 
     @abstractmethod
-    def recorrer(self, origen: V) -> None:
+    def _recorrer(self, origen: V, profundidad_max: Optional[int], registrar: bool) -> Iterator[V]:
         pass
 
+    def iterar(self, origen: V, parada: Optional[Callable[[V], bool]] = None,
+               profundidad_max: Optional[int] = None, registrar: bool = True) -> Iterator[V]:
+        self._tree = {}
+        self._path = []
+        self._terminado = False
+        self._compacto = None
+        expandidos = 0
+        try:
+            for vertice in self._recorrer(origen, profundidad_max, registrar):
+                expandidos += 1
+                if registrar:
+                    self._path.append(vertice)
+                yield vertice
+                if parada is not None and parada(vertice):
+                    return
+        finally:
+            self._terminado = True
+            # Se suma una vez al acabar para no pagar la instrumentación por vértice
+            if instrumentacion.ACTIVA:
+                nombre = type(self).__name__
+                instrumentacion.incrementar(f"recorrido.{nombre}.recorridos")
+                instrumentacion.incrementar(f"recorrido.{nombre}.vertices_expandidos", expandidos)
+
+    def traverse(self, source: V, destino: Optional[V] = None, parada: Optional[Callable[[V], bool]] = None,
+                 profundidad_max: Optional[int] = None, registrar: bool = True) -> None:
+        if destino is not None:
+            condicion = parada
+            parada = lambda v: v == destino or (condicion is not None and condicion(v))
+        for _ in self.iterar(source, parada, profundidad_max, registrar):
+            pass
+
+    def recorrer(self, origen: V) -> None:
+        self.traverse(origen)
+
+    def _arbol(self) -> Optional[_ArbolCompacto[V]]:
+        # Solo se compacta un árbol terminado: mientras se recorre, el diccionario aún cambia
+        if not self._terminado:
+            return None
+        if self._compacto is None:
+            self._compacto = _ArbolCompacto(self._tree)
+        return self._compacto
+
     def path_to_origin(self, source: V) -> List[V]:
+        arbol = self._arbol()
+        if arbol is not None:
+            return arbol.camino(source)
         path = []
         actual = source
+        tree = self._tree
         while actual is not None:
             path.append(actual)
-            actual = self._tree.get(actual, (None, 0))[0]
+            entrada = tree.get(actual)
+            actual = entrada[0] if entrada is not None else None
         return path[::-1]
 
     def origin(self, vertice: V) -> Optional[V]:
+        arbol = self._arbol()
+        if arbol is not None:
+            return arbol.raiz(vertice)
         actual = vertice
         while actual in self._tree and self._tree[actual][0] is not None:
             actual = self._tree[actual][0]
@@ -136,62 +329,166 @@ class Recorrido(ABC, Generic[V, E]):
 
     def get_path(self) -> List[V]:
         return self._path
+
+    def __str__(self) -> str:
+        return f"Camino recorrido: {self._path}\nÁrbol de recorridos: {self._tree}"
     
 #RECORRIDO PROFUNDIDAD
 class RecorridoProfundidad(Recorrido[V, E]):
     @staticmethod
-    def of(grafo: Grafo[V, E]) -> RecorridoProfundidad[V, E]:
-        return RecorridoProfundidad(grafo)
+    def of(grafo: Grafo[V, E], peso: Callable[[E], float] = peso_por_defecto) -> RecorridoProfundidad[V, E]:
+        return RecorridoProfundidad(grafo, peso)
 
-    def traverse(self, source: V) -> None:
-        self._tree = {}
-        self._path = []
+    def _recorrer(self, origen: V, profundidad_max: Optional[int], registrar: bool) -> Iterator[V]:
+        adyacencias = self._grafo.adyacencias
+        tree = self._tree
         visitados: Set[V] = set()
-        pila: List[V] = [source]
-        self._tree[source] = (None, 0)  
+        pila: List[Tuple[V, int]] = [(origen, 0)]
+        if registrar:
+            tree[origen] = (None, 0)
 
         while pila:
-            vertice = pila.pop()  
-            if vertice not in visitados:
-                visitados.add(vertice)  
-                self._path.append(vertice)
-
-                for vecino in reversed(list(self._grafo.successors(vertice))):
-                    if vecino not in visitados:
-                        pila.append(vecino)
-                        costo_previo = self._tree[vertice][1]
-                        peso_arista = self._grafo.edge_weight(vertice, vecino) or 1
-                        self._tree[vecino] = (vertice, costo_previo + peso_arista)
+            vertice, profundidad = pila.pop()
+            if vertice in visitados:
+                continue
+            visitados.add(vertice)
+            yield vertice
+            if profundidad_max is not None and profundidad >= profundidad_max:
+                continue
+            for vecino, arista in reversed(list(adyacencias.get(vertice, {}).items())):
+                if vecino not in visitados:
+                    pila.append((vecino, profundidad + 1))
+                    if registrar:
+                        tree[vecino] = (vertice, tree[vertice][1] + self._peso(arista))
 
-    def __str__(self) -> str:
-        return f"Camino recorrido: {self._path}\nÁrbol de recorridos: {self._tree}"
+#RECORRIDO ANCHURA
+class RecorridoAnchura(Recorrido[V, E]):
+    @staticmethod
+    def of(grafo: Grafo[V, E], peso: Callable[[E], float] = peso_por_defecto) -> RecorridoAnchura[V, E]:
+        return RecorridoAnchura(grafo, peso)
+
+    def _recorrer(self, origen: V, profundidad_max: Optional[int], registrar: bool) -> Iterator[V]:
+        adyacencias = self._grafo.adyacencias
+        tree = self._tree
+        vistos: Set[V] = {origen}
+        cola: deque = deque([(origen, 0)])
+        if registrar:
+            tree[origen] = (None, 0)
+
+        while cola:
+            vertice, profundidad = cola.popleft()
+            yield vertice
+            if profundidad_max is not None and profundidad >= profundidad_max:
+                continue
+            for vecino, arista in adyacencias.get(vertice, {}).items():
+                if vecino not in vistos:
+                    vistos.add(vecino)
+                    cola.append((vecino, profundidad + 1))
+                    if registrar:
+                        tree[vecino] = (vertice, tree[vertice][1] + self._peso(arista))
+
+#RECORRIDO DIJKSTRA
+class RecorridoDijkstra(Recorrido[V, E]):
+    # Recorre los vértices en orden de distancia mínima al origen (pesos no negativos)
+    @staticmethod
+    def of(grafo: Grafo[V, E], peso: Callable[[E], float] = peso_por_defecto) -> RecorridoDijkstra[V, E]:
+        return RecorridoDijkstra(grafo, peso)
+
+    def _recorrer(self, origen: V, profundidad_max: Optional[int], registrar: bool) -> Iterator[V]:
+        adyacencias = self._grafo.adyacencias
+        distancias: Dict[V, float] = {origen: 0}
+        padres: Dict[V, Optional[V]] = {origen: None}
+        cerrados: Set[V] = set()
+        desempate = count()
+        monticulo: List[Tuple[float, int, V, int]] = [(0, next(desempate), origen, 0)]
+
+        while monticulo:
+            distancia, _, vertice, profundidad = heapq.heappop(monticulo)
+            if vertice in cerrados:
+                continue
+            cerrados.add(vertice)
+            if registrar:
+                self._tree[vertice] = (padres[vertice], distancia)
+            yield vertice
+            if profundidad_max is not None and profundidad >= profundidad_max:
+                continue
+            for vecino, arista in adyacencias.get(vertice, {}).items():
+                if vecino in cerrados:
+                    continue
+                nueva = distancia + self._peso(arista)
+                if nueva < distancias.get(vecino, inf):
+                    distancias[vecino] = nueva
+                    padres[vecino] = vertice
+                    heapq.heappush(monticulo, (nueva, next(desempate), vecino, profundidad + 1))
 
 #USUARIO
+# Reglas de validación comunes a los setters, Usuario.parse y la carga por lotes.
+# Cada función devuelve el motivo del rechazo, o None si el valor es válido
+def _error_dni(dni: Any) -> Optional[str]:
+    if not isinstance(dni, str) or len(dni) != 9 or not dni[:-1].isdigit() or not dni[-1].isalpha():
+        return "El DNI debe tener 8 dígitos seguidos de una letra, por ejemplo: '12345678A'"
+    return None
+
+def _error_nombre(nombre: Any) -> Optional[str]:
+    return None if nombre and isinstance(nombre, str) else "El nombre no puede estar vacío"
+
+def _error_apellidos(apellidos: Any) -> Optional[str]:
+    return None if apellidos and isinstance(apellidos, str) else "Los apellidos no pueden estar vacíos"
+
+def _error_fecha(fecha: Any, hoy: date) -> Optional[str]:
+    if not isinstance(fecha, date):
+        return "La fecha de nacimiento debe ser una instancia de datetime.date"
+    if fecha >= hoy:
+        return "La fecha de nacimiento debe ser anterior a la fecha actual"
+    return None
+
+_FECHA_ISO = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+def _leer_fecha(texto: str) -> date:
+    # Acepta lo mismo que strptime(texto, "%Y-%m-%d"); el caso habitual (aaaa-mm-dd) va por fromisoformat, más rápido
+    if _FECHA_ISO.fullmatch(texto):
+        return date.fromisoformat(texto)
+    return datetime.strptime(texto, "%Y-%m-%d").date()
+
+def _campos_usuario(linea: str) -> Tuple[str, str, str, date]:
+    # 'dni,nombre,apellidos,aaaa-mm-dd' -> campos sin validar; ValueError si la línea no tiene ese formato
+    partes = linea.strip().split(",")
+    if len(partes) != 4:
+        raise ValueError(f"La línea no tiene el formato correcto: {linea.strip()}")
+    dni, nombre, apellidos, fecha_nacimiento = partes
+    try:
+        return dni, nombre, apellidos, _leer_fecha(fecha_nacimiento)
+    except ValueError:
+        raise ValueError(f"Fecha de nacimiento no válida: {fecha_nacimiento!r}") from None
+
 class Usuario:
+    __slots__ = ('_dni', '_nombre', '_apellidos', '_fecha_nacimiento', '_hash')
+
     def __init__(self, dni: str, nombre: str, apellidos: str, fecha_nacimiento: date):
-        self.dni = dni
+        error = _error_dni(dni)
+        if error:
+            raise ValueError(error)
+        self._dni = dni
+        self._hash = hash(dni)
         self.nombre = nombre
         self.apellidos = apellidos
         self.fecha_nacimiento = fecha_nacimiento
 
+    # El DNI es de solo lectura: la igualdad y el hash dependen de él, y cambiarlo en un
+    # usuario que ya es vértice de un grafo o clave de un diccionario los dejaría inconsistentes
     @property
     def dni(self) -> str:
         return self._dni
 
-    @dni.setter
-    def dni(self, value: str) -> None:
-        if not isinstance(value, str) or not value[:-1].isdigit() or not value[-1].isalpha() or len(value) != 9:
-            raise ValueError("El DNI debe tener 8 dígitos seguidos de una letra, por ejemplo: '12345678A'")
-        self._dni = value
-
     @property
     def nombre(self) -> str:
         return self._nombre
 
     @nombre.setter
     def nombre(self, value: str) -> None:
-        if not value or not isinstance(value, str):
-            raise ValueError("El nombre no puede estar vacío")
+        error = _error_nombre(value)
+        if error:
+            raise ValueError(error)
         self._nombre = value
 
     @property
@@ -200,8 +497,9 @@ class Usuario:
 
     @apellidos.setter
     def apellidos(self, value: str) -> None:
-        if not value or not isinstance(value, str):
-            raise ValueError("Los apellidos no pueden estar vacíos")
+        error = _error_apellidos(value)
+        if error:
+            raise ValueError(error)
         self._apellidos = value
 
     @property
@@ -210,10 +508,9 @@ class Usuario:
 
     @fecha_nacimiento.setter
     def fecha_nacimiento(self, value: date) -> None:
-        if not isinstance(value, date):
-            raise ValueError("La fecha de nacimiento debe ser una instancia de datetime.date")
-        if value >= date.today():
-            raise ValueError("La fecha de nacimiento debe ser anterior a la fecha actual")
+        error = _error_fecha(value, date.today())
+        if error:
+            raise ValueError(error)
         self._fecha_nacimiento = value
 
     @staticmethod
@@ -222,77 +519,539 @@ class Usuario:
 
     @classmethod
     def parse(cls, cadena: str) -> "Usuario":
-        dni, nombre, apellidos, fecha_nacimiento = cadena.split(",")
-        fecha_nacimiento = datetime.strptime(fecha_nacimiento, "%Y-%m-%d").date()
+        dni, nombre, apellidos, fecha_nacimiento = _campos_usuario(cadena)
         return cls(dni=dni, nombre=nombre, apellidos=apellidos, fecha_nacimiento=fecha_nacimiento)
 
+    @classmethod
+    def confiable(cls, dni: str, nombre: str, apellidos: str, fecha_nacimiento: date) -> Usuario:
+        '''
+        SOLO PARA DATOS DE CONFIANZA: construye el usuario sin ninguna de las
+        comprobaciones del constructor. Quien la llama garantiza que los campos ya
+        cumplen las reglas de Usuario (como hace validar_lote); con datos sin
+        validar se obtienen usuarios no válidos sin ningún error.
+        '''
+        usuario = object.__new__(cls)
+        usuario._dni = dni
+        usuario._hash = hash(dni)
+        usuario._nombre = nombre
+        usuario._apellidos = apellidos
+        usuario._fecha_nacimiento = fecha_nacimiento
+        return usuario
+
+    @classmethod
+    def validar_lote(cls, filas: Iterable[Tuple[str, str, str, date]]) -> Tuple[List[Usuario], List[Tuple[int, str]]]:
+        '''
+        Valida muchas filas (dni, nombre, apellidos, fecha_nacimiento) de una vez con las mismas
+        reglas que los setters, pero consultando la fecha actual una sola vez.
+        Devuelve los usuarios válidos y una lista (posición, motivo) de las filas rechazadas.
+        '''
+        hoy = date.today()
+        usuarios: List[Usuario] = []
+        rechazados: List[Tuple[int, str]] = []
+        for i, (dni, nombre, apellidos, fecha_nacimiento) in enumerate(filas):
+            error = _error_dni(dni) or _error_nombre(nombre) or _error_apellidos(apellidos) \
+                or _error_fecha(fecha_nacimiento, hoy)
+            if error:
+                rechazados.append((i, error))
+            else:
+                usuarios.append(cls.confiable(dni, nombre, apellidos, fecha_nacimiento))
+        return usuarios, rechazados
+
+    @classmethod
+    def parse_lote(cls, lineas: Iterable[str]) -> Tuple[List[Usuario], List[Tuple[int, str]]]:
+        # Igual que Usuario.parse con cada línea, pero las líneas no válidas se apuntan en lugar de lanzar
+        filas = []
+        errores: List[Tuple[int, str]] = []
+        posiciones: List[int] = []
+        medir = instrumentacion.ACTIVA
+        inicio = perf_counter() if medir else 0.0
+        for i, linea in enumerate(lineas):
+            try:
+                filas.append(_campos_usuario(linea))
+            except ValueError as error:
+                errores.append((i, str(error)))
+                continue
+            posiciones.append(i)
+        if medir:
+            instrumentacion.observar("usuario.parse_lote.lectura", perf_counter() - inicio)
+        usuarios, rechazados = cls.validar_lote(filas)
+        errores.extend((posiciones[i], motivo) for i, motivo in rechazados)
+        errores.sort()
+        return usuarios, errores
+
+    # Dos usuarios con el mismo DNI son el mismo vértice del grafo
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Usuario):
+            return NotImplemented
+        return self._dni == other._dni
+
+    def __hash__(self) -> int:
+        return self._hash
+
     def __str__(self) -> str:
         return f"{self.dni} - {self.nombre}"
 
+#GENERADOR DE IDENTIFICADORES
+class GeneradorIds:
+    '''
+    Reparte identificadores únicos. El cerrojo solo se toma al reservar un bloque de
+    ids; cada hilo tiene su propio bloque y un cargador puede reservar uno entero,
+    y a partir de ahí asignan ids sin sincronizarse con nadie más.
+    Los ids son únicos entre los hilos de un proceso, no entre procesos: un proceso
+    hijo parte de una copia del contador y repetiría ids. Por eso los procesos de
+    Red_social.parse solo leen filas y los ids se asignan en el proceso principal.
+    '''
+    def __init__(self, inicio: int = 1, tam_bloque: int = 1024):
+        self._siguiente: int = inicio
+        self._tam_bloque: int = tam_bloque
+        self._cerrojo = Lock()
+        self._local = local()
+        self._generacion: int = 0
+
+    def reservar(self, n: int) -> range:
+        if n < 0:
+            raise ValueError("El número de ids a reservar no puede ser negativo")
+        with self._cerrojo:
+            inicio = self._siguiente
+            self._siguiente += n
+        return range(inicio, inicio + n)
+
+    def reservar_hasta(self, tope: int) -> None:
+        '''
+        Garantiza que no se repartirá ningún id menor que tope, por ejemplo tras
+        cargar relaciones que ya traen su id. Los bloques que tengan los hilos
+        se descartan al pedir su siguiente id.
+        '''
+        with self._cerrojo:
+            if tope > self._siguiente:
+                self._siguiente = tope
+                self._generacion += 1
+
+    def siguiente(self) -> int:
+        bloque = getattr(self._local, 'bloque', None)
+        if bloque is not None and self._local.generacion == self._generacion:
+            id = next(bloque, None)
+            if id is not None:
+                return id
+        self._local.generacion = self._generacion
+        self._local.bloque = iter(self.reservar(self._tam_bloque))
+        return next(self._local.bloque)
+
 #RELACIÓN
 class Relacion:
-    xx_num = 0 
+    __slots__ = ('id', 'interacciones', 'dias_activa')
+    ids: GeneradorIds = GeneradorIds()
 
-    def __init__(self, interacciones: int, dias_activa: int):
-        Relacion.xx_num += 1 
-        self.id = Relacion.xx_num  
+    def __init__(self, interacciones: int, dias_activa: int, id: Optional[int] = None):
+        self.id = Relacion.ids.siguiente() if id is None else id
         self.interacciones = interacciones
         self.dias_activa = dias_activa
 
     @staticmethod
-    def of(interacciones: int, dias_activa: int) -> Relacion:
-        return Relacion(interacciones, dias_activa)
+    def of(interacciones: int, dias_activa: int, id: Optional[int] = None) -> Relacion:
+        return Relacion(interacciones, dias_activa, id)
 
     def __str__(self) -> str:
         return f"({self.id} - días activa: {self.dias_activa} - num interacciones {self.interacciones})"
 
 #RED SOCIAL
+def _leer_relaciones(rango: Tuple[str, int, int]) -> List[Any]:
+    # Lee las líneas 'dni_origen,dni_destino,interacciones,dias_activa' de un rango de bytes.
+    # Una línea mal formada deja en su lugar el motivo (una cadena), para no mover las posiciones
+    fichero, inicio, fin = rango
+    filas: List[Any] = []
+    for bloque in bloques_binarios(fichero, separadores=b'\n', inicio=inicio, fin=fin):
+        for line in bloque.decode('utf-8').splitlines():
+            line = line.strip()
+            if line:
+                partes = line.split(',')
+                try:
+                    if len(partes) != 4:
+                        raise ValueError
+                    filas.append((partes[0], partes[1], int(partes[2]), int(partes[3])))
+                except ValueError:
+                    filas.append(f"La línea no tiene el formato correcto: {line}")
+    return filas
+
 class Red_social(Grafo[Usuario, Relacion]):
     def __init__(self, es_dirigido: bool = False, tipo_recorrido: str = "BACK") -> None:
         super().__init__(es_dirigido)
         self.usuarios_dni: Dict[str, Usuario] = {}
+        self.rechazados: List[Tuple[int, str]] = []
+        self.rechazados_relaciones: List[Tuple[int, str]] = [] #(fila, motivo) de las relaciones que no se cargan
+        # Agregados de las relaciones salientes de cada usuario, mantenidos en add_edge:
+        # [suma interacciones, máx. interacciones, suma días activa, máx. días activa]
+        self._agregados: Dict[Usuario, List[Optional[int]]] = {}
 
     @staticmethod
     def of(es_dirigido: bool = False, tipo_recorrido: str = "BACK") -> Red_social:
         return Red_social(es_dirigido, tipo_recorrido)
     
     @staticmethod
-    def parse(usuarios_file: str, relaciones_file: str) -> Red_social:
-        red_social = Red_social()
+    def parse(usuarios_file: str, relaciones_file: str, es_dirigido: bool = False,
+              procesos: int = 1, id_inicial: Optional[int] = None) -> Red_social:
+        '''
+        Con procesos > 1 el fichero de relaciones se parte en rangos de líneas que se
+        leen en paralelo. Después se cuentan las filas y la relación de la fila i
+        (contando desde 0) recibe el id base + i, con el mismo resultado para
+        cualquier número de procesos. Por defecto base es el inicio de un bloque
+        nuevo de Relacion.ids, así que los ids no se repiten con los ya repartidos
+        ni entre cargas. Con id_inicial se usa base = id_inicial y los ids solo
+        dependen del fichero; quien lo pasa responde de que no choquen con otros
+        ya repartidos (Relacion.ids se avanza después para que no se repitan).
+        '''
+        red_social = Red_social(es_dirigido)
         
-        # Leer usuarios
-        with open(usuarios_file, 'r') as f:
-            for line in f:
-                dni, nombre, apellidos, fecha_nacimiento = line.strip().split(',')
-                usuario = Usuario.parse(dni, nombre, apellidos, fecha_nacimiento)
+        # Leer usuarios: las líneas no válidas se guardan en rechazados en lugar de parar la carga
+        with instrumentacion.medir("red_social.parse.usuarios"):
+            with open(usuarios_file, 'r') as f:
+                usuarios, red_social.rechazados = Usuario.parse_lote(f)
+            for usuario in usuarios:
                 red_social.add_vertex(usuario)
         
         # Leer relaciones
-        with open(relaciones_file, 'r') as f:
-            for line in f:
-                dni_origen, dni_destino, interacciones, dias_activa = line.strip().split(',')
-                origen = red_social.usuarios_dni[dni_origen]
-                destino = red_social.usuarios_dni[dni_destino]
-                relacion = Relacion.of(int(interacciones), int(dias_activa))
-                red_social.add_edge(origen, destino, relacion)
+        with instrumentacion.medir("red_social.parse.leer_relaciones"):
+            rangos = [(relaciones_file, inicio, fin) for inicio, fin in rangos_alineados(relaciones_file, procesos, b'\n')]
+            if procesos > 1 and len(rangos) > 1:
+                with ProcessPoolExecutor(max_workers=procesos) as pool:
+                    fragmentos = list(pool.map(_leer_relaciones, rangos))
+            else:
+                fragmentos = [_leer_relaciones(rango) for rango in rangos]
+        num_filas = sum(len(filas) for filas in fragmentos)
+        base = Relacion.ids.reservar(num_filas).start if id_inicial is None else id_inicial
+        with instrumentacion.medir("red_social.parse.add_edges"):
+            usuarios_dni = red_social.usuarios_dni
+            rechazados_relaciones = red_social.rechazados_relaciones
+            def aristas():
+                # Las relaciones mal formadas o con un usuario rechazado o desconocido se apuntan y se saltan
+                filas = (fila for fragmento in fragmentos for fila in fragmento)
+                for i, fila in enumerate(filas):
+                    if isinstance(fila, str):
+                        rechazados_relaciones.append((i, fila))
+                        continue
+                    dni_origen, dni_destino, interacciones, dias_activa = fila
+                    origen = usuarios_dni.get(dni_origen)
+                    destino = usuarios_dni.get(dni_destino)
+                    if origen is None or destino is None:
+                        dni = dni_origen if origen is None else dni_destino
+                        rechazados_relaciones.append((i, f"Usuario no cargado: {dni!r}"))
+                    else:
+                        yield origen, destino, Relacion.of(interacciones, dias_activa, base + i)
+            red_social.add_edges(aristas())
+            if id_inicial is not None:
+                Relacion.ids.reservar_hasta(id_inicial + num_filas)
+        if instrumentacion.ACTIVA:
+            instrumentacion.incrementar("red_social.parse.usuarios", len(usuarios))
+            instrumentacion.incrementar("red_social.parse.rechazados", len(red_social.rechazados))
+            instrumentacion.incrementar("red_social.parse.rechazados_relaciones", len(red_social.rechazados_relaciones))
+            instrumentacion.incrementar("red_social.parse.relaciones", num_filas)
         
         return red_social
 
+    def usuario(self, dni: str) -> Optional[Usuario]:
+        return self.usuarios_dni.get(dni)
+
     def add_vertex(self, usuario: Usuario) -> None:
-        super().add_vertex(usuario)
-        self.usuarios_dni[usuario.dni] = usuario
+        # Si ya hay un usuario con ese DNI se conserva el primero (internado)
+        if usuario.dni not in self.usuarios_dni:
+            super().add_vertex(usuario)
+            self.usuarios_dni[usuario.dni] = usuario
 
     def add_edge(self, origen: Usuario, destino: Usuario, relacion: Relacion) -> None:
+        self.add_vertex(origen)
+        self.add_vertex(destino)
+        origen = self.usuarios_dni[origen.dni]
+        destino = self.usuarios_dni[destino.dni]
+        anterior = self.adyacencias[origen].get(destino)
         super().add_edge(origen, destino, relacion)
+        self._actualizar_agregados(origen, relacion, anterior)
+        if not self.es_dirigido and destino is not origen:
+            self._actualizar_agregados(destino, relacion, anterior)
 
-    def __str__(self) -> str:
-        resultado = []
-        for usuario in self.vertices():
-            relaciones = ", ".join([f"{relacion}" for _, relacion in self.adyacencias[usuario].items()])
-            resultado.append(f"{usuario} -> {relaciones}")
-        return "\n".join(resultado)
+    def add_edges(self, aristas: Iterable[Tuple[Usuario, Usuario, Relacion]]) -> None:
+        # Los agregados se actualizan arista a arista como en add_edge, con la relación que
+        # sustituye cada una (de antes del lote o del propio lote)
+        adyacencias = self.adyacencias
+        dirigido = self.es_dirigido
+        lote = []
+        anteriores: List[Optional[Relacion]] = []
+        en_lote: Dict[Tuple[Usuario, Usuario], Relacion] = {}
+        for origen, destino, relacion in aristas:
+            self.add_vertex(origen)
+            self.add_vertex(destino)
+            origen = self.usuarios_dni[origen.dni]
+            destino = self.usuarios_dni[destino.dni]
+            anterior = en_lote.get((origen, destino))
+            anteriores.append(anterior if anterior is not None else adyacencias[origen].get(destino))
+            en_lote[(origen, destino)] = relacion
+            if not dirigido:
+                en_lote[(destino, origen)] = relacion
+            lote.append((origen, destino, relacion))
+        super().add_edges(lote)
+        recalcular: Set[Usuario] = set()
+        for (origen, destino, relacion), anterior in zip(lote, anteriores):
+            if origen not in recalcular and not self._cambiar_agregado(origen, relacion, anterior):
+                recalcular.add(origen)
+            if not dirigido and destino is not origen and destino not in recalcular \
+                    and not self._cambiar_agregado(destino, relacion, anterior):
+                recalcular.add(destino)
+        for usuario in recalcular:
+            self._agregados[usuario] = Red_social._agregar(adyacencias[usuario].values())
+
+    def _actualizar_agregados(self, usuario: Usuario, relacion: Relacion, anterior: Optional[Relacion]) -> None:
+        if not self._cambiar_agregado(usuario, relacion, anterior):
+            self._agregados[usuario] = Red_social._agregar(self.adyacencias[usuario].values())
+
+    def _cambiar_agregado(self, usuario: Usuario, relacion: Relacion, anterior: Optional[Relacion]) -> bool:
+        '''
+        Suma relacion a los agregados del usuario, restando antes la relación
+        anterior si la sustituye. Devuelve False si no se puede actualizar sin
+        recorrer sus relaciones: cuando la anterior era el máximo y la nueva es menor.
+        '''
+        agregado = self._agregados.get(usuario)
+        if agregado is None:
+            self._agregados[usuario] = Red_social._agregar((relacion,))
+            return anterior is None
+        if anterior is not None:
+            if (anterior.interacciones == agregado[1] and relacion.interacciones < agregado[1]) or \
+                    (anterior.dias_activa == agregado[3] and relacion.dias_activa < agregado[3]):
+                return False
+            agregado[0] -= anterior.interacciones
+            agregado[2] -= anterior.dias_activa
+        agregado[0] += relacion.interacciones
+        agregado[1] = max(agregado[1], relacion.interacciones)
+        agregado[2] += relacion.dias_activa
+        agregado[3] = max(agregado[3], relacion.dias_activa)
+        return True
+
+    @staticmethod
+    def _agregar(relaciones: Iterable[Relacion]) -> List[Optional[int]]:
+        # Los máximos empiezan en None (no en 0), igual que al crear el agregado en
+        # _cambiar_agregado, para que valores negativos o nulos den el mismo resultado
+        agregado: List[Optional[int]] = [0, None, 0, None]
+        for relacion in relaciones:
+            agregado[0] += relacion.interacciones
+            if agregado[1] is None or relacion.interacciones > agregado[1]:
+                agregado[1] = relacion.interacciones
+            agregado[2] += relacion.dias_activa
+            if agregado[3] is None or relacion.dias_activa > agregado[3]:
+                agregado[3] = relacion.dias_activa
+        return agregado
+
+    _POSICION_AGREGADO = {('interacciones', 'suma'): 0, ('interacciones', 'max'): 1,
+                          ('dias_activa', 'suma'): 2, ('dias_activa', 'max'): 3}
+
+    def agregado(self, usuario: Usuario, campo: str = 'interacciones', agregado: str = 'suma') -> Optional[int]:
+        # Un usuario sin relaciones tiene suma 0 y no tiene máximo (None)
+        if (campo, agregado) not in Red_social._POSICION_AGREGADO:
+            raise ValueError("campo debe ser 'interacciones' o 'dias_activa' y agregado 'suma' o 'max'")
+        valores = self._agregados.get(usuario)
+        if valores is None:
+            return 0 if agregado == 'suma' else None
+        return valores[Red_social._POSICION_AGREGADO[(campo, agregado)]]
+
+    def top_usuarios(self, k: int, campo: str = 'interacciones', agregado: str = 'suma') -> List[Tuple[Usuario, int]]:
+        '''
+        Los k usuarios con mayor suma o máximo de interacciones o días activa de sus
+        relaciones, usando los agregados ya calculados y un montículo de tamaño k.
+        '''
+        if (campo, agregado) not in Red_social._POSICION_AGREGADO:
+            raise ValueError("campo debe ser 'interacciones' o 'dias_activa' y agregado 'suma' o 'max'")
+        posicion = Red_social._POSICION_AGREGADO[(campo, agregado)]
+        return [(usuario, valores[posicion])
+                for usuario, valores in heapq.nlargest(k, self._agregados.items(), key=lambda par: par[1][posicion])]
+
+    def _linea(self, usuario: Usuario, relaciones: Dict[Usuario, Relacion], limite: Optional[int] = None) -> str:
+        return f"{usuario} -> {resumen(map(str, relaciones.values()), len(relaciones), limite)}"
+
+#TESTS
+def test_num_aristas():
+    import random
+    print("Pruebas de Grafo.num_aristas")
+    aleatorio = random.Random(0)
+    aristas = [(aleatorio.randrange(20), aleatorio.randrange(20), i) for i in range(200)] #Con lazos y repetidas
+    for es_dirigido in (True, False):
+        uno_a_uno = Grafo.of(es_dirigido)
+        for origen, destino, arista in aristas:
+            uno_a_uno.add_edge(origen, destino, arista)
+        por_lotes = Grafo.of(es_dirigido)
+        for i in range(0, len(aristas), 30):
+            por_lotes.add_edges(aristas[i:i + 30])
+        entradas = sum(len(destinos) for destinos in uno_a_uno.adyacencias.values())
+        lazos = sum(1 for v, destinos in uno_a_uno.adyacencias.items() if v in destinos)
+        esperado = entradas if es_dirigido else (entradas + lazos) // 2
+        assert uno_a_uno.num_aristas() == por_lotes.num_aristas() == esperado, (es_dirigido, esperado)
+        assert f"{esperado} aristas" in str(por_lotes)
+    print("Pruebas superadas exitosamente.")
+
+def test_add_edges_red_social():
+    print("Pruebas de Red_social.add_edges")
+    usuarios = [Usuario.of(f"{i:08d}{'TRWAGMYFPDXBNJZSQVHLCKE'[i % 23]}", "Nombre", "Apellido", date(1990, 1, 1))
+                for i in range(1, 6)]
+    a, b, c, d, e = usuarios
+    aristas = [(a, b, Relacion.of(10, 5)), (a, c, Relacion.of(3, 7)), (b, c, Relacion.of(8, 1)),
+               (a, b, Relacion.of(1, 1)),  # sustituye a una del mismo lote y era el máximo de a
+               (d, e, Relacion.of(4, 4)), (c, b, Relacion.of(2, 9)), (e, d, Relacion.of(6, 2))]
+    for es_dirigido in (False, True):
+        uno_a_uno = Red_social.of(es_dirigido)
+        for origen, destino, relacion in aristas:
+            uno_a_uno.add_edge(origen, destino, relacion)
+        for tam_lote in (len(aristas), 3, 1):
+            por_lotes = Red_social.of(es_dirigido)
+            for i in range(0, len(aristas), tam_lote):
+                por_lotes.add_edges(aristas[i:i + tam_lote])
+            assert por_lotes.adyacencias == uno_a_uno.adyacencias
+            assert por_lotes._agregados == uno_a_uno._agregados, (es_dirigido, tam_lote, por_lotes._agregados)
+            assert por_lotes._agregados == {u: Red_social._agregar(r.values())
+                                            for u, r in por_lotes.adyacencias.items() if r}
+    # Los agregados incrementales coinciden con los recalculados también con valores
+    # negativos o nulos y con sustituciones
+    import random
+    aleatorio = random.Random(0)
+    for es_dirigido in (False, True):
+        red = Red_social.of(es_dirigido)
+        for k in range(400):
+            origen, destino = aleatorio.choice(usuarios), aleatorio.choice(usuarios)
+            relacion = Relacion.of(aleatorio.randint(-5, 0), aleatorio.randint(-5, 0))
+            if k % 2:
+                red.add_edge(origen, destino, relacion)
+            else:
+                red.add_edges([(origen, destino, relacion)])
+            assert red._agregados == {u: [sum(x.interacciones for x in r.values()), max(x.interacciones for x in r.values()),
+                                          sum(x.dias_activa for x in r.values()), max(x.dias_activa for x in r.values())]
+                                      for u, r in red.adyacencias.items() if r}, k
+    assert max(v for _, v in red.top_usuarios(5, 'dias_activa', 'max')) <= 0
+    sin_relaciones = Red_social.of()
+    sin_relaciones.add_vertex(a)
+    assert sin_relaciones.agregado(a) == 0 and sin_relaciones.agregado(a, 'interacciones', 'max') is None
+    assert Red_social._agregar([]) == [0, None, 0, None]
+    print("Pruebas superadas exitosamente.")
+
+def test_generador_ids():
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    print("Pruebas de GeneradorIds")
+    generador = GeneradorIds(tam_bloque=8)
+    assert generador.reservar(5) == range(1, 6)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        repartidos = list(pool.map(lambda _: generador.siguiente(), range(1000)))
+    assert len(set(repartidos)) == 1000 and min(repartidos) >= 6
+    generador.reservar_hasta(5000)
+    assert generador.siguiente() >= 5000
+    # Cada Red_social.parse reserva un bloque nuevo: los ids no se repiten entre cargas
+    with tempfile.TemporaryDirectory() as directorio:
+        usuarios_file = os.path.join(directorio, "usuarios.txt")
+        relaciones_file = os.path.join(directorio, "relaciones.txt")
+        with open(usuarios_file, 'w') as f:
+            f.write("12345678Z,Ana,Lopez,1990-01-01\n87654321X,Luis,Diaz,1985-05-05\n11111111H,Eva,Ruiz,1970-03-03\n")
+        with open(relaciones_file, 'w') as f:
+            f.write("12345678Z,87654321X,3,4\n87654321X,11111111H,5,6\n")
+        anterior = Relacion.of(1, 1).id
+        cargas = [Red_social.parse(usuarios_file, relaciones_file, es_dirigido=True, procesos=p) for p in (1, 2, 1)]
+        ids = [sorted(r.id for destinos in red.adyacencias.values() for r in destinos.values()) for red in cargas]
+        todos = [id for ids_carga in ids for id in ids_carga] + [anterior, Relacion.of(1, 1).id]
+        assert len(set(todos)) == len(todos) == 8, ids
+        assert all(b == a + 1 for a, b in ids) #Dentro de una carga, base + fila
+        # Con id_inicial los ids solo dependen de la posición de cada fila
+        otra = Red_social.parse(usuarios_file, relaciones_file, es_dirigido=True, id_inicial=100)
+        assert sorted(r.id for destinos in otra.adyacencias.values() for r in destinos.values()) == [100, 101]
+    print("Pruebas superadas exitosamente.")
+
+def test_usuario():
+    print("Pruebas de Usuario")
+    ana = Usuario.of("12345678Z", "Ana", "Lopez", date(1990, 1, 1))
+    red = Red_social.of()
+    red.add_vertex(ana)
+    try:
+        ana.dni = "87654321X"
+        assert False, "El DNI no se debe poder cambiar"
+    except AttributeError:
+        pass
+    assert ana.dni == "12345678Z" and ana in red.adyacencias and red.usuario("12345678Z") is ana
+    ana.nombre = "Ana María" #El resto de campos sí se pueden cambiar, con validación
+    try:
+        ana.nombre = ""
+        assert False, "El nombre vacío no es válido"
+    except ValueError:
+        pass
+    try:
+        Usuario.of("1234X", "Ana", "Lopez", date(1990, 1, 1))
+        assert False, "El DNI no es válido"
+    except ValueError:
+        pass
+    print("Pruebas superadas exitosamente.")
+
+def test_parse_lote():
+    import os
+    import tempfile
+    print("Pruebas de Usuario.validar_lote y parse_lote")
+    usuarios, rechazados = Usuario.validar_lote([("12345678Z", "Ana", "Lopez", date(1990, 1, 1)),
+                                                 ("1234X", "Luis", "Diaz", date(1990, 1, 1)),
+                                                 ("87654321X", "", "Diaz", date(1990, 1, 1)),
+                                                 ("87654321X", "Luis", "Diaz", date(2999, 1, 1)),
+                                                 ("11111111H", "Eva", "Ruiz", "1990-01-01")])
+    assert [u.dni for u in usuarios] == ["12345678Z"]
+    assert [i for i, _ in rechazados] == [1, 2, 3, 4]
+    usuarios, rechazados = Usuario.parse_lote(["12345678Z,Ana,Lopez,1990-01-01\n", "sin comas\n",
+                                               "87654321X,Luis,Diaz,1990-13-01\n", "1234X,C,D,1990-01-01\n",
+                                               "11111111H,Eva,Ruiz,1970-03-03\n"])
+    assert [u.dni for u in usuarios] == ["12345678Z", "11111111H"]
+    assert [i for i, _ in rechazados] == [1, 2, 3]
+    # Usuario.parse y parse_lote aceptan y rechazan exactamente las mismas líneas
+    lineas = ["12345678Z,Ana,Lopez,1990-1-5", "12345678Z,Ana,Lopez,19900105", "12345678Z,Ana,Lopez,1990-02-30",
+              "１２３４５６７８Z,Ana,Lopez,1990-01-05", "12345678Z,,Lopez,1990-01-05", "12345678Z,Ana,Lopez,1990-01-05\r\n"]
+    aceptadas = []
+    for linea in lineas:
+        try:
+            aceptadas.append(Usuario.parse(linea).fecha_nacimiento)
+        except ValueError:
+            aceptadas.append(None)
+    usuarios, rechazados = Usuario.parse_lote(lineas)
+    assert [u.fecha_nacimiento for u in usuarios] == [f for f in aceptadas if f is not None]
+    assert [i for i, _ in rechazados] == [i for i, f in enumerate(aceptadas) if f is None] == [1, 2, 4]
+    # Las relaciones con un usuario rechazado o mal formadas se saltan y se apuntan
+    with tempfile.TemporaryDirectory() as directorio:
+        usuarios_file = os.path.join(directorio, "usuarios.txt")
+        relaciones_file = os.path.join(directorio, "relaciones.txt")
+        with open(usuarios_file, 'w') as f:
+            f.write("12345678Z,Ana,Lopez,1990-01-01\n1234X,C,D,1990-01-01\n87654321X,Luis,Diaz,1985-05-05\n")
+        with open(relaciones_file, 'w') as f:
+            f.write("12345678Z,1234X,3,4\n12345678Z,87654321X,5,6\n12345678Z,87654321X,x,6\n"
+                    "sin comas\n87654321X,12345678Z,7,8\n")
+        for procesos in (1, 2):
+            red = Red_social.parse(usuarios_file, relaciones_file, es_dirigido=True, procesos=procesos)
+            assert [i for i, _ in red.rechazados] == [1]
+            assert [i for i, _ in red.rechazados_relaciones] == [0, 2, 3], red.rechazados_relaciones
+            assert red.rechazados_relaciones[0] == (0, "Usuario no cargado: '1234X'")
+            assert red.num_aristas() == 2
+    print("Pruebas superadas exitosamente.")
+
+#BENCHMARK
+def benchmark_construccion(num_aristas: int = 1_000_000, num_vertices: int = 100_000, semilla: int = 0) -> None:
+    import random
+    aleatorio = random.Random(semilla)
+    aristas = [(aleatorio.randrange(num_vertices), aleatorio.randrange(num_vertices), i) for i in range(num_aristas)]
+    for es_dirigido in (True, False):
+        inicio = perf_counter()
+        grafo = Grafo.of(es_dirigido)
+        for origen, destino, arista in aristas:
+            grafo.add_edge(origen, destino, arista)
+        bucle = perf_counter() - inicio
+        inicio = perf_counter()
+        bulk = Grafo.from_edges(aristas, es_dirigido)
+        lote = perf_counter() - inicio
+        assert bulk.adyacencias == grafo.adyacencias
+        por_millon = 1_000_000 / num_aristas
+        print(f"dirigido={es_dirigido}: add_edge {bucle * por_millon:.2f} s/millón, "
+              f"from_edges {lote * por_millon:.2f} s/millón (x{bucle / lote:.2f})")
 
 if __name__ == '__main__':
+    test_num_aristas()
+    test_usuario()
+    test_add_edges_red_social()
+    test_generador_ids()
+    test_parse_lote()
     grafo = Grafo.of(es_dirigido=True)
     grafo.add_vertex("A")
     grafo.add_vertex("B")
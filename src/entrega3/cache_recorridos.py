@@ -0,0 +1,101 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import TypeVar, Generic, Callable, Dict, List, Optional, Tuple, Type, Any
+
+from entrega3.ENTREGA3 import Grafo, Recorrido, RecorridoAnchura, peso_por_defecto
+
+V = TypeVar('V')
+E = TypeVar('E')
+
+#CACHÉ DE RECORRIDOS
+class CacheRecorridos(Generic[V, E]):
+    '''
+    Guarda los árboles de recorrido completos ya calculados, con clave
+    (versión del grafo, origen, estrategia, peso), y expulsa el menos usado
+    recientemente cuando se supera la capacidad en entradas o en vértices
+    guardados. Las consultas repetidas desde un mismo origen se responden con
+    path_to_origin sobre el árbol guardado.
+    '''
+    def __init__(self, grafo: Grafo[V, E], capacidad: int = 128, max_vertices: Optional[int] = None):
+        if capacidad <= 0:
+            raise ValueError("La capacidad debe ser mayor que 0")
+        self._grafo: Grafo[V, E] = grafo
+        self.capacidad: int = capacidad
+        self.max_vertices: Optional[int] = max_vertices
+        self._entradas: OrderedDict[Tuple[Any, ...], Recorrido[V, E]] = OrderedDict()
+        self._version: int = grafo.version
+        self._vertices: int = 0
+        self.aciertos: int = 0
+        self.fallos: int = 0
+        self.expulsiones: int = 0
+
+    @staticmethod
+    def of(grafo: Grafo[V, E], capacidad: int = 128, max_vertices: Optional[int] = None) -> CacheRecorridos[V, E]:
+        return CacheRecorridos(grafo, capacidad, max_vertices)
+
+    def recorrido(self, origen: V, estrategia: Type[Recorrido] = RecorridoAnchura,
+                  peso: Callable[[E], float] = peso_por_defecto) -> Recorrido[V, E]:
+        if self._version != self._grafo.version:
+            # Los árboles de una versión anterior ya no se pueden volver a pedir
+            self.clear()
+            self._version = self._grafo.version
+        clave = (self._version, origen, estrategia, peso)
+        recorrido = self._entradas.get(clave)
+        if recorrido is not None:
+            self.aciertos += 1
+            self._entradas.move_to_end(clave)
+            return recorrido
+        self.fallos += 1
+        recorrido = estrategia.of(self._grafo, peso)
+        recorrido.traverse(origen)
+        self._entradas[clave] = recorrido
+        self._vertices += len(recorrido.get_tree())
+        self._expulsar()
+        return recorrido
+
+    def camino(self, origen: V, destino: V, estrategia: Type[Recorrido] = RecorridoAnchura,
+               peso: Callable[[E], float] = peso_por_defecto) -> List[V]:
+        # Camino desde origen hasta destino, o [] si destino no es alcanzable
+        recorrido = self.recorrido(origen, estrategia, peso)
+        if destino not in recorrido.get_tree():
+            return []
+        return recorrido.path_to_origin(destino)
+
+    def _expulsar(self) -> None:
+        while len(self._entradas) > 1 and (len(self._entradas) > self.capacidad or
+                                           (self.max_vertices is not None and self._vertices > self.max_vertices)):
+            _, recorrido = self._entradas.popitem(last=False)
+            self._vertices -= len(recorrido.get_tree())
+            self.expulsiones += 1
+
+    def clear(self) -> None:
+        self._entradas.clear()
+        self._vertices = 0
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {'entradas': len(self._entradas), 'vertices': self._vertices, 'aciertos': self.aciertos,
+                'fallos': self.fallos, 'expulsiones': self.expulsiones}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+#TESTS
+def test_cache_recorridos():
+    print("Pruebas de CacheRecorridos")
+    grafo = Grafo.of(es_dirigido=False)
+    for origen, destino in [("A", "B"), ("B", "C"), ("C", "D"), ("D", "E")]:
+        grafo.add_edge(origen, destino, 1)
+    cache = CacheRecorridos.of(grafo, capacidad=2)
+    assert cache.camino("A", "E") == ["A", "B", "C", "D", "E"]
+    assert cache.camino("A", "C") == ["A", "B", "C"]
+    cache.camino("B", "E")
+    cache.camino("C", "E")
+    print(cache.estadisticas())
+    assert cache.estadisticas() == {'entradas': 2, 'vertices': 10, 'aciertos': 1, 'fallos': 3, 'expulsiones': 1}
+    grafo.add_edge("A", "E", 1)
+    assert cache.camino("A", "E") == ["A", "E"], "La caché no se invalidó al modificar el grafo"
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_cache_recorridos()
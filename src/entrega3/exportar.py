@@ -0,0 +1,365 @@
+'''
+Exportación e importación de grafos a formatos de intercambio (lista de aristas
+CSV, GraphML y JSON lines). Los escritores escriben arista a arista en el
+fichero abierto y los lectores leen en flujo, sin construir cadenas con el
+grafo completo.
+
+Los vértices y las aristas se convierten con funciones que recibe cada método:
+- clave: vértice -> cadena que lo identifica (por defecto str).
+- datos_vertice / datos_arista: objeto -> diccionario de atributos.
+- crear_vertice / crear_arista: lo contrario al leer.
+- crear_grafo: construye el grafo vacío a partir de si es dirigido (por defecto Grafo.of).
+'''
+from __future__ import annotations
+from typing import TypeVar, Callable, Dict, Iterator, List, Optional, Set, Tuple, TextIO, Any
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape, quoteattr
+import csv
+import json
+
+from entrega3.ENTREGA3 import Grafo, Red_social, Usuario, Relacion
+from datetime import date
+
+V = TypeVar('V')
+E = TypeVar('E')
+
+_GRAPHML = '{http://graphml.graphdrawing.org/xmlns}'
+
+#ARISTAS
+def _aristas(grafo: Grafo[V, E]) -> Iterator[Tuple[V, V, E]]:
+    # En un grafo no dirigido cada arista está guardada dos veces: se emite una sola
+    if grafo.es_dirigido:
+        for origen, destinos in grafo.adyacencias.items():
+            for destino, arista in destinos.items():
+                yield origen, destino, arista
+    else:
+        posicion = {v: i for i, v in enumerate(grafo.adyacencias)}
+        for origen, destinos in grafo.adyacencias.items():
+            i = posicion[origen]
+            for destino, arista in destinos.items():
+                if i <= posicion[destino]:
+                    yield origen, destino, arista
+
+def _por_lotes(grafo: Grafo[V, E], aristas: Iterator[Tuple[V, V, E]], tam_lote: int = 100_000) -> None:
+    lote = []
+    for arista in aristas:
+        lote.append(arista)
+        if len(lote) >= tam_lote:
+            grafo.add_edges(lote)
+            lote = []
+    if lote:
+        grafo.add_edges(lote)
+
+#LISTA DE ARISTAS (CSV)
+def escribir_csv(grafo: Grafo[V, E], fh: TextIO, clave: Callable[[V], str] = str,
+                 datos_arista: Callable[[E], Dict[str, Any]] = lambda e: {'peso': e}) -> None:
+    '''
+    Columnas: origen, destino y los atributos de la arista (tomados de la primera).
+    Los vértices sin aristas salientes se escriben al final en filas con el
+    destino vacío, para no perder los aislados. El CSV no guarda si el grafo es
+    dirigido: hay que indicarlo al leerlo con leer_csv(es_dirigido=...).
+    '''
+    escritor = csv.writer(fh)
+    cabecera = None
+    for origen, destino, arista in _aristas(grafo):
+        datos = datos_arista(arista)
+        if cabecera is None:
+            cabecera = ['origen', 'destino', *datos]
+            escritor.writerow(cabecera)
+        escritor.writerow([clave(origen), clave(destino), *datos.values()])
+    if cabecera is None:
+        escritor.writerow(['origen', 'destino'])
+    for vertice, destinos in grafo.adyacencias.items():
+        if not destinos:
+            escritor.writerow([clave(vertice), ''])
+
+def leer_csv(fh: TextIO, crear_vertice: Callable[[str], V] = str,
+             crear_arista: Callable[[Dict[str, str]], E] = lambda d: d.get('peso'),
+             es_dirigido: bool = True, crear_grafo: Callable[[bool], Grafo] = Grafo.of) -> Grafo[V, E]:
+    # Una fila con el destino vacío es un vértice sin aristas salientes
+    grafo = crear_grafo(es_dirigido)
+    vertices: Dict[str, V] = {}
+    def aristas():
+        for fila in csv.DictReader(fh):
+            origen, destino = fila.pop('origen'), fila.pop('destino')
+            if origen not in vertices:
+                vertices[origen] = crear_vertice(origen)
+            if not destino:
+                grafo.add_vertex(vertices[origen])
+                continue
+            if destino not in vertices:
+                vertices[destino] = crear_vertice(destino)
+            yield vertices[origen], vertices[destino], crear_arista(fila)
+    _por_lotes(grafo, aristas())
+    return grafo
+
+#GRAPHML
+def _tipo_graphml(valor: Any) -> str:
+    if isinstance(valor, bool):
+        return 'boolean'
+    if isinstance(valor, int):
+        return 'long'
+    if isinstance(valor, float):
+        return 'double'
+    return 'string'
+
+def _unir_tipos(anterior: Optional[str], tipo: str) -> str:
+    # Si un atributo tiene valores de varios tipos se declara con el más general
+    if anterior is None or anterior == tipo:
+        return tipo
+    if {anterior, tipo} == {'long', 'double'}:
+        return 'double'
+    return 'string'
+
+def _texto_graphml(valor: Any) -> str:
+    return ('true' if valor else 'false') if isinstance(valor, bool) else escape(str(valor))
+
+def escribir_graphml(grafo: Grafo[V, E], fh: TextIO, clave: Callable[[V], str] = str,
+                     datos_vertice: Callable[[V], Dict[str, Any]] = lambda v: {},
+                     datos_arista: Callable[[E], Dict[str, Any]] = lambda e: {'peso': e}) -> None:
+    # Las declaraciones <key> van antes de <graph>: una primera pasada recorre todos los
+    # vértices y aristas para reunir sus atributos (y tipos) sin guardar nada más
+    tipos: Dict[Tuple[str, str], str] = {}
+    for ambito, objetos, datos_de in (('node', grafo.adyacencias, datos_vertice),
+                                      ('edge', (a for _, _, a in _aristas(grafo)), datos_arista)):
+        for objeto in objetos:
+            for nombre, valor in datos_de(objeto).items():
+                tipos[(ambito, str(nombre))] = _unir_tipos(tipos.get((ambito, str(nombre))), _tipo_graphml(valor))
+    claves: Dict[Tuple[str, str], str] = {}
+    fh.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    for (ambito, nombre), tipo in tipos.items():
+        identificador = f"d{len(claves)}"
+        claves[(ambito, nombre)] = identificador
+        fh.write(f'<key id="{identificador}" for="{ambito}" attr.name={quoteattr(nombre)} '
+                 f'attr.type="{tipo}"/>\n')
+    fh.write(f'<graph edgedefault="{"directed" if grafo.es_dirigido else "undirected"}">\n')
+    def datos_xml(ambito: str, datos: Dict[str, Any]) -> str:
+        return ''.join(f'<data key="{claves[(ambito, str(k))]}">{_texto_graphml(v)}</data>'
+                       for k, v in datos.items())
+    for vertice in grafo.adyacencias:
+        fh.write(f'<node id={quoteattr(clave(vertice))}>{datos_xml("node", datos_vertice(vertice))}</node>\n')
+    for origen, destino, arista in _aristas(grafo):
+        fh.write(f'<edge source={quoteattr(clave(origen))} target={quoteattr(clave(destino))}>'
+                 f'{datos_xml("edge", datos_arista(arista))}</edge>\n')
+    fh.write('</graph>\n</graphml>\n')
+
+def leer_graphml(fh, crear_vertice: Callable[[str, Dict[str, str]], V] = lambda clave, datos: clave,
+                 crear_arista: Callable[[Dict[str, str]], E] = lambda d: d.get('peso'),
+                 crear_grafo: Callable[[bool], Grafo] = Grafo.of) -> Grafo[V, E]:
+    # Los <data> se traducen a attr.name con las declaraciones <key> (y sus <default>);
+    # iterparse procesa elemento a elemento y cada nodo o arista leído se suelta de <graph>.
+    # Una arista que nombra un nodo que aún no ha aparecido espera a ese <node> (para
+    # crearlo con sus datos); las que siguen esperando al final crean el nodo sin datos
+    eventos = iterparse(fh, events=('start', 'end'))
+    es_dirigido = True
+    nombres: Dict[str, str] = {}
+    por_defecto: Dict[str, Dict[str, str]] = {'node': {}, 'edge': {}}
+    grafo_xml = None
+    for evento, elemento in eventos:
+        if evento == 'end' and elemento.tag == _GRAPHML + 'key':
+            nombre = elemento.get('attr.name', elemento.get('id'))
+            nombres[elemento.get('id')] = nombre
+            defecto = elemento.find(_GRAPHML + 'default')
+            if defecto is not None:
+                for ambito in (('node', 'edge') if elemento.get('for', 'all') == 'all' else (elemento.get('for'),)):
+                    if ambito in por_defecto:
+                        por_defecto[ambito][nombre] = defecto.text or ''
+        elif evento == 'start' and elemento.tag == _GRAPHML + 'graph':
+            es_dirigido = elemento.get('edgedefault', 'directed') == 'directed'
+            grafo_xml = elemento
+            break
+    grafo = crear_grafo(es_dirigido)
+    vertices: Dict[str, V] = {}
+    def datos(ambito: str, elemento) -> Dict[str, str]:
+        resultado = dict(por_defecto[ambito])
+        for d in elemento.iter(_GRAPHML + 'data'):
+            resultado[nombres.get(d.get('key'), d.get('key'))] = d.text or ''
+        return resultado
+    # Aristas (origen, destino, datos) a la espera de alguno de sus nodos, en orden de llegada:
+    # las de un mismo par de nodos esperan a los mismos, así que no cambia cuál gana
+    pendientes: List[Tuple[str, str, Dict[str, str]]] = []
+    esperados: Set[str] = set()
+    def listas() -> Iterator[Tuple[V, V, E]]:
+        nonlocal pendientes
+        siguen = []
+        for origen, destino, datos_arista in pendientes:
+            if origen in vertices and destino in vertices:
+                yield vertices[origen], vertices[destino], crear_arista(datos_arista)
+            else:
+                siguen.append((origen, destino, datos_arista))
+        pendientes = siguen
+        esperados.clear()
+        esperados.update(c for origen, destino, _ in siguen for c in (origen, destino) if c not in vertices)
+    def aristas():
+        for evento, elemento in eventos:
+            if evento != 'end':
+                continue
+            if elemento.tag == _GRAPHML + 'node':
+                clave = elemento.get('id')
+                if clave not in vertices:
+                    vertices[clave] = crear_vertice(clave, datos('node', elemento))
+                grafo.add_vertex(vertices[clave])
+                grafo_xml.clear()
+                if clave in esperados:
+                    yield from listas()
+            elif elemento.tag == _GRAPHML + 'edge':
+                origen, destino = elemento.get('source'), elemento.get('target')
+                if origen in vertices and destino in vertices:
+                    arista = (vertices[origen], vertices[destino], crear_arista(datos('edge', elemento)))
+                    grafo_xml.clear()
+                    yield arista
+                else:
+                    pendientes.append((origen, destino, datos('edge', elemento)))
+                    esperados.update(c for c in (origen, destino) if c not in vertices)
+                    grafo_xml.clear()
+        # Nodos que no se declaran nunca: se crean sin datos
+        for origen, destino, _ in pendientes:
+            for clave in (origen, destino):
+                if clave not in vertices:
+                    vertices[clave] = crear_vertice(clave, dict(por_defecto['node']))
+        yield from listas()
+    _por_lotes(grafo, aristas())
+    return grafo
+
+#JSON LINES
+def escribir_jsonl(grafo: Grafo[V, E], fh: TextIO, clave: Callable[[V], str] = str,
+                   datos_vertice: Callable[[V], Dict[str, Any]] = lambda v: {},
+                   datos_arista: Callable[[E], Dict[str, Any]] = lambda e: {'peso': e}) -> None:
+    # Una primera línea con la cabecera, después una por vértice y una por arista
+    fh.write(json.dumps({'dirigido': grafo.es_dirigido}) + '\n')
+    for vertice in grafo.adyacencias:
+        fh.write(json.dumps({'vertice': clave(vertice), **datos_vertice(vertice)}, ensure_ascii=False) + '\n')
+    for origen, destino, arista in _aristas(grafo):
+        fh.write(json.dumps({'origen': clave(origen), 'destino': clave(destino), **datos_arista(arista)},
+                            ensure_ascii=False) + '\n')
+
+def leer_jsonl(fh: TextIO, crear_vertice: Callable[[str, Dict[str, Any]], V] = lambda clave, datos: clave,
+               crear_arista: Callable[[Dict[str, Any]], E] = lambda d: d.get('peso'),
+               crear_grafo: Callable[[bool], Grafo] = Grafo.of) -> Grafo[V, E]:
+    cabecera = json.loads(fh.readline())
+    grafo = crear_grafo(cabecera.get('dirigido', True))
+    vertices: Dict[str, V] = {}
+    def aristas():
+        for linea in fh:
+            if not linea.strip():
+                continue
+            datos = json.loads(linea)
+            if 'vertice' in datos:
+                clave = datos.pop('vertice')
+                vertices[clave] = crear_vertice(clave, datos)
+                grafo.add_vertex(vertices[clave])
+            else:
+                origen, destino = datos.pop('origen'), datos.pop('destino')
+                yield vertices[origen], vertices[destino], crear_arista(datos)
+    _por_lotes(grafo, aristas())
+    return grafo
+
+#RED SOCIAL
+def escribir_red_social(red_social: Red_social, fh: TextIO) -> None:
+    escribir_jsonl(red_social, fh, clave=lambda u: u.dni,
+                   datos_vertice=lambda u: {'nombre': u.nombre, 'apellidos': u.apellidos,
+                                            'fecha_nacimiento': u.fecha_nacimiento.isoformat()},
+                   datos_arista=lambda r: {'id': r.id, 'interacciones': r.interacciones,
+                                           'dias_activa': r.dias_activa})
+
+def leer_red_social(fh: TextIO) -> Red_social:
+    # Los datos ya vienen validados de escribir_red_social: se usa Usuario.confiable.
+    # Las relaciones conservan su id, así que los nuevos ids empiezan después del mayor leído
+    max_id = 0
+    def crear_arista(d: Dict[str, Any]) -> Relacion:
+        nonlocal max_id
+        max_id = max(max_id, d['id'])
+        return Relacion.of(d['interacciones'], d['dias_activa'], d['id'])
+    red_social = leer_jsonl(fh,
+                            crear_vertice=lambda dni, d: Usuario.confiable(dni, d['nombre'], d['apellidos'],
+                                                                           date.fromisoformat(d['fecha_nacimiento'])),
+                            crear_arista=crear_arista,
+                            crear_grafo=Red_social.of)
+    Relacion.ids.reservar_hasta(max_id + 1)
+    return red_social
+
+
+#TESTS
+def test_exportar():
+    import io
+    print("Pruebas de exportar")
+    grafo = Grafo.of(es_dirigido=False)
+    for origen, destino, peso in [("A", "B", 5), ("B", "C", 3), ("C", "A", 1)]:
+        grafo.add_edge(origen, destino, peso)
+    grafo.add_vertex("D")
+    entero = lambda d: int(d['peso'])
+    for escribir, leer in [(escribir_csv, lambda fh: leer_csv(fh, crear_arista=entero, es_dirigido=False)),
+                           (escribir_graphml, lambda fh: leer_graphml(fh, crear_arista=entero)),
+                           (escribir_jsonl, lambda fh: leer_jsonl(fh))]:
+        texto = io.StringIO()
+        escribir(grafo, texto)
+        datos = texto.getvalue()
+        copia = leer(io.BytesIO(datos.encode()) if escribir is escribir_graphml else io.StringIO(datos))
+        assert copia.adyacencias == grafo.adyacencias, f"{escribir.__name__}: {copia.adyacencias}"
+        assert copia.es_dirigido == grafo.es_dirigido
+    texto = io.StringIO()
+    escribir_graphml(grafo, texto)
+    assert '<key id="d0" for="edge" attr.name="peso" attr.type="long"/>' in texto.getvalue()
+    assert '<data key="d0">5</data>' in texto.getvalue()
+    # Fichero GraphML con claves declaradas como las escriben otras herramientas
+    externo = ('<?xml version="1.0" encoding="UTF-8"?>'
+               '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">'
+               '<key id="d0" for="edge" attr.name="peso" attr.type="long"><default>1</default></key>'
+               '<key id="d1" for="node" attr.name="color" attr.type="string"/>'
+               '<graph edgedefault="directed">'
+               '<node id="A"><data key="d1">rojo</data></node><node id="B"/>'
+               '<edge source="A" target="B"><data key="d0">5</data></edge>'
+               '<edge source="B" target="C"/>'
+               '</graph></graphml>')
+    colores = {}
+    def crear_vertice(clave, datos):
+        colores[clave] = datos.get('color')
+        return clave
+    copia = leer_graphml(io.BytesIO(externo.encode()), crear_vertice=crear_vertice, crear_arista=entero)
+    assert copia.adyacencias == {'A': {'B': 5}, 'B': {'C': 1}, 'C': {}}, copia.adyacencias
+    assert colores == {'A': 'rojo', 'B': None, 'C': None}
+    # Una arista antes de sus nodos no hace perder los datos de esos nodos, y el orden de
+    # las aristas del mismo par se respeta
+    externo = ('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">'
+               '<key id="c" for="node" attr.name="color"/><key id="p" for="edge" attr.name="peso"/>'
+               '<graph edgedefault="directed">'
+               '<edge source="A" target="B"><data key="p">1</data></edge>'
+               '<node id="A"><data key="c">rojo</data></node>'
+               '<edge source="A" target="B"><data key="p">2</data></edge>'
+               '<edge source="A" target="A"><data key="p">3</data></edge>'
+               '<node id="B"><data key="c">azul</data></node>'
+               '<edge source="B" target="Z"><data key="p">4</data></edge>'
+               '</graph></graphml>')
+    colores.clear()
+    copia = leer_graphml(io.BytesIO(externo.encode()), crear_vertice=crear_vertice, crear_arista=entero)
+    assert copia.adyacencias == {'A': {'B': 2, 'A': 3}, 'B': {'Z': 4}, 'Z': {}}, copia.adyacencias
+    assert colores == {'A': 'rojo', 'B': 'azul', 'Z': None}
+    # Las claves se declaran con los atributos de todos los vértices y aristas, no solo del primero
+    mixto = Grafo.of()
+    mixto.add_edge("A", "B", {'peso': 1})
+    mixto.add_edge("B", "C", {'peso': 2.5, 'etiqueta': 'x'})
+    texto = io.StringIO()
+    escribir_graphml(mixto, texto, datos_vertice=lambda v: {'grande': True} if v == "C" else {}, datos_arista=dict)
+    assert 'attr.name="peso" attr.type="double"' in texto.getvalue()
+    copia = leer_graphml(io.BytesIO(texto.getvalue().encode()), crear_arista=dict)
+    assert copia.edge_weight("B", "C") == {'peso': '2.5', 'etiqueta': 'x'} and copia.edge_weight("A", "B") == {'peso': '1'}
+    # El CSV no guarda si el grafo es dirigido: se lee como se indique
+    texto = io.StringIO()
+    escribir_csv(mixto, texto, datos_arista=lambda d: {'peso': d['peso']})
+    assert leer_csv(io.StringIO(texto.getvalue()), es_dirigido=True).adyacencias == \
+        {'A': {'B': '1'}, 'B': {'C': '2.5'}, 'C': {}}
+    assert leer_csv(io.StringIO(texto.getvalue()), es_dirigido=False).edge_weight("C", "B") == '2.5'
+    red = Red_social.of()
+    ana = Usuario.of("12345678Z", "Ana", "Lopez", date(1990, 1, 1))
+    luis = Usuario.of("87654321X", "Luis", "Diaz", date(1985, 5, 5))
+    red.add_edge(ana, luis, Relacion.of(3, 10, id=Relacion.ids.siguiente() + 10_000))
+    texto = io.StringIO()
+    escribir_red_social(red, texto)
+    copia = leer_red_social(io.StringIO(texto.getvalue()))
+    cargada = copia.adyacencias[copia.usuario("12345678Z")][copia.usuario("87654321X")]
+    assert Relacion.of(1, 1).id > cargada.id, "los ids nuevos no deben repetir los cargados"
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_exportar()
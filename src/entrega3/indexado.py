@@ -0,0 +1,42 @@
+from __future__ import annotations
+from typing import TypeVar, Generic, Dict, List
+
+from entrega3.ENTREGA3 import Grafo
+
+V = TypeVar('V')
+E = TypeVar('E')
+
+#GRAFO INDEXADO
+class GrafoIndexado(Generic[V, E]):
+    '''
+    Copia de la estructura de un Grafo con los vértices numerados de 0 a n-1 y
+    las adyacencias como listas de enteros. Los algoritmos trabajan con estos
+    enteros en lugar de con los objetos vértice y no crean conjuntos nuevos en
+    cada consulta. Es una foto del grafo: deja de ser válida cuando el grafo cambia.
+    '''
+    def __init__(self, grafo: Grafo[V, E]):
+        self.grafo: Grafo[V, E] = grafo
+        self.version: int = grafo.version
+        self.vertices: List[V] = list(grafo.adyacencias)
+        self.indice: Dict[V, int] = {v: i for i, v in enumerate(self.vertices)}
+        indice = self.indice
+        self.sucesores: List[List[int]] = [[indice[d] for d in grafo.adyacencias[v]] for v in self.vertices]
+        if grafo.es_dirigido:
+            self.predecesores: List[List[int]] = [[] for _ in self.vertices]
+            for i, destinos in enumerate(self.sucesores):
+                for j in destinos:
+                    self.predecesores[j].append(i)
+        else:
+            self.predecesores = self.sucesores
+
+    @staticmethod
+    def of(grafo: Grafo[V, E]) -> GrafoIndexado[V, E]:
+        return GrafoIndexado(grafo)
+
+    @property
+    def n(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def actualizado(self) -> bool:
+        return self.version == self.grafo.version
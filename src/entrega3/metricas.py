@@ -0,0 +1,173 @@
+from __future__ import annotations
+from collections import Counter, deque
+from heapq import nlargest
+from typing import TypeVar, Generic, Dict, List, Optional, Tuple, Any
+import random
+
+from entrega3.ENTREGA3 import Grafo
+from entrega3.indexado import GrafoIndexado
+
+V = TypeVar('V')
+E = TypeVar('E')
+
+#MÉTRICAS DE GRAFOS
+class Metricas(Generic[V, E]):
+    '''
+    Métricas sobre un Grafo (grados, clustering, intermediación, PageRank) calculadas
+    sobre su versión indexada con enteros. Los resultados se guardan en caché y se
+    descartan automáticamente cuando el grafo se modifica.
+    '''
+    def __init__(self, grafo: Grafo[V, E]):
+        self._grafo: Grafo[V, E] = grafo
+        self._indexado: Optional[GrafoIndexado[V, E]] = None
+        self._cache: Dict[Tuple[Any, ...], Any] = {}
+
+    @staticmethod
+    def of(grafo: Grafo[V, E]) -> Metricas[V, E]:
+        return Metricas(grafo)
+
+    def _g(self) -> GrafoIndexado[V, E]:
+        if self._indexado is None or not self._indexado.actualizado:
+            self._indexado = GrafoIndexado.of(self._grafo)
+            self._cache = {}
+        return self._indexado
+
+    def _cacheado(self, clave: Tuple[Any, ...], calcular) -> Any:
+        g = self._g()
+        if clave not in self._cache:
+            self._cache[clave] = calcular(g)
+        return self._cache[clave]
+
+    def _por_vertice(self, valores: List[Any]) -> Dict[V, Any]:
+        return dict(zip(self._g().vertices, valores))
+
+    #GRADOS
+    def grados(self) -> Dict[V, int]:
+        return self._por_vertice(self._cacheado(('grados',), lambda g: [len(s) for s in g.sucesores]))
+
+    def grados_entrada(self) -> Dict[V, int]:
+        return self._por_vertice(self._cacheado(('grados_entrada',), lambda g: [len(p) for p in g.predecesores]))
+
+    def distribucion_grados(self) -> Dict[int, int]:
+        return dict(sorted(self._cacheado(('distribucion',),
+                                          lambda g: Counter(len(s) for s in g.sucesores)).items()))
+
+    def ranking_grados(self, k: int) -> List[Tuple[V, int]]:
+        return nlargest(k, self.grados().items(), key=lambda par: par[1])
+
+    #CLUSTERING
+    def _clustering(self, g: GrafoIndexado[V, E]) -> List[float]:
+        # Se consideran vecinos los sucesores y los predecesores (grafo no dirigido subyacente)
+        vecinos = [set(s).union(p) for s, p in zip(g.sucesores, g.predecesores)]
+        for i, vs in enumerate(vecinos):
+            vs.discard(i)
+        resultado = []
+        for vs in vecinos:
+            k = len(vs)
+            if k < 2:
+                resultado.append(0.0)
+                continue
+            enlaces = sum(len(vs & vecinos[j]) for j in vs) // 2
+            resultado.append(2 * enlaces / (k * (k - 1)))
+        return resultado
+
+    def clustering(self) -> Dict[V, float]:
+        return self._por_vertice(self._cacheado(('clustering',), self._clustering))
+
+    def clustering_medio(self) -> float:
+        valores = self._cacheado(('clustering',), self._clustering)
+        return sum(valores) / len(valores) if valores else 0.0
+
+    #INTERMEDIACIÓN (BRANDES)
+    def _intermediacion(self, g: GrafoIndexado[V, E], muestras: Optional[int], semilla: int) -> List[float]:
+        n = g.n
+        fuentes = range(n)
+        if muestras is not None and muestras < n:
+            fuentes = random.Random(semilla).sample(range(n), muestras)
+        resultado = [0.0] * n
+        for s in fuentes:
+            pila = []
+            predecesores: List[List[int]] = [[] for _ in range(n)]
+            caminos = [0] * n
+            caminos[s] = 1
+            distancia = [-1] * n
+            distancia[s] = 0
+            cola = deque([s])
+            while cola:
+                v = cola.popleft()
+                pila.append(v)
+                for w in g.sucesores[v]:
+                    if distancia[w] < 0:
+                        distancia[w] = distancia[v] + 1
+                        cola.append(w)
+                    if distancia[w] == distancia[v] + 1:
+                        caminos[w] += caminos[v]
+                        predecesores[w].append(v)
+            dependencia = [0.0] * n
+            while pila:
+                w = pila.pop()
+                for v in predecesores[w]:
+                    dependencia[v] += caminos[v] / caminos[w] * (1 + dependencia[w])
+                if w != s:
+                    resultado[w] += dependencia[w]
+        escala = n / len(fuentes) if len(fuentes) else 0.0
+        if not g.grafo.es_dirigido:
+            escala /= 2
+        return [x * escala for x in resultado]
+
+    def intermediacion(self, muestras: Optional[int] = None, semilla: int = 0) -> Dict[V, float]:
+        '''
+        Centralidad de intermediación. Con muestras = k se estima usando solo k
+        orígenes al azar (reescalado por n/k), para grafos grandes.
+        '''
+        return self._por_vertice(self._cacheado(('intermediacion', muestras, semilla),
+                                                lambda g: self._intermediacion(g, muestras, semilla)))
+
+    #PAGERANK
+    def _pagerank(self, g: GrafoIndexado[V, E], amortiguamiento: float, iteraciones: int,
+                  tolerancia: float) -> List[float]:
+        n = g.n
+        if n == 0:
+            return []
+        rango = [1.0 / n] * n
+        salida = [len(s) for s in g.sucesores]
+        for _ in range(iteraciones):
+            colgante = sum(r for r, k in zip(rango, salida) if k == 0)
+            base = (1 - amortiguamiento) / n + amortiguamiento * colgante / n
+            nuevo = [base] * n
+            for v, destinos in enumerate(g.sucesores):
+                if destinos:
+                    aporte = amortiguamiento * rango[v] / salida[v]
+                    for w in destinos:
+                        nuevo[w] += aporte
+            diferencia = sum(abs(a - b) for a, b in zip(nuevo, rango))
+            rango = nuevo
+            if diferencia < tolerancia:
+                break
+        return rango
+
+    def pagerank(self, amortiguamiento: float = 0.85, iteraciones: int = 100,
+                 tolerancia: float = 1e-10) -> Dict[V, float]:
+        return self._por_vertice(self._cacheado(('pagerank', amortiguamiento, iteraciones, tolerancia),
+                                                lambda g: self._pagerank(g, amortiguamiento, iteraciones, tolerancia)))
+
+
+#TESTS
+def test_metricas():
+    print("Pruebas de Metricas")
+    grafo = Grafo.of(es_dirigido=False)
+    for origen, destino in [("A", "B"), ("B", "C"), ("C", "A"), ("C", "D")]:
+        grafo.add_edge(origen, destino, 1)
+    metricas = Metricas.of(grafo)
+    print(f"Grados: {metricas.grados()}")
+    print(f"Clustering: {metricas.clustering()}")
+    print(f"Intermediación: {metricas.intermediacion()}")
+    print(f"PageRank: {metricas.pagerank()}")
+    assert metricas.intermediacion()["C"] == 2.0
+    assert metricas.clustering()["A"] == 1.0
+    grafo.add_edge("D", "E", 1)
+    assert metricas.grados()["D"] == 2, "La caché no se invalidó al modificar el grafo"
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_metricas()
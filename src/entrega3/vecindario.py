@@ -0,0 +1,122 @@
+from __future__ import annotations
+from collections import Counter
+from typing import TypeVar, Generic, Dict, Iterable, List, Optional, Set
+
+from entrega3.ENTREGA3 import Grafo
+from entrega3.indexado import GrafoIndexado
+
+V = TypeVar('V')
+E = TypeVar('E')
+
+#CONSULTAS DE VECINDARIO
+class Vecindario(Generic[V, E]):
+    '''
+    Consultas de vecindad (vértices a k saltos, amigos comunes, amigos de amigos)
+    sobre la versión indexada del grafo. Los visitados se marcan en un bytearray y,
+    en las consultas por lotes, cada vértice guarda en un entero los bits de las
+    semillas que ya lo han alcanzado, de modo que un único recorrido sirve para
+    todas las semillas del lote.
+    '''
+    def __init__(self, grafo: Grafo[V, E], tam_lote: int = 256):
+        self._grafo: Grafo[V, E] = grafo
+        self._indexado: Optional[GrafoIndexado[V, E]] = None
+        self.tam_lote: int = tam_lote
+
+    @staticmethod
+    def of(grafo: Grafo[V, E], tam_lote: int = 256) -> Vecindario[V, E]:
+        return Vecindario(grafo, tam_lote)
+
+    def _g(self) -> GrafoIndexado[V, E]:
+        if self._indexado is None or not self._indexado.actualizado:
+            self._indexado = GrafoIndexado.of(self._grafo)
+        return self._indexado
+
+    def a_distancia(self, origen: V, k: int) -> Set[V]:
+        # Vértices a k saltos o menos de origen, sin incluir el propio origen
+        g = self._g()
+        s = g.indice[origen]
+        visitados = bytearray(g.n)
+        visitados[s] = 1
+        frontera = [s]
+        alcanzados: List[int] = []
+        for _ in range(k):
+            siguiente = []
+            for v in frontera:
+                for w in g.sucesores[v]:
+                    if not visitados[w]:
+                        visitados[w] = 1
+                        siguiente.append(w)
+            if not siguiente:
+                break
+            alcanzados.extend(siguiente)
+            frontera = siguiente
+        return {g.vertices[i] for i in alcanzados}
+
+    def a_distancia_lote(self, origenes: Iterable[V], k: int) -> Dict[V, Set[V]]:
+        g = self._g()
+        origenes = list(dict.fromkeys(origenes))
+        resultado: Dict[V, Set[V]] = {}
+        for inicio in range(0, len(origenes), self.tam_lote):
+            lote = origenes[inicio:inicio + self.tam_lote]
+            resultado.update(self._lote(g, lote, k))
+        return resultado
+
+    def _lote(self, g: GrafoIndexado[V, E], lote: List[V], k: int) -> Dict[V, Set[V]]:
+        alcanzado = [0] * g.n
+        frontera: Dict[int, int] = {}
+        for bit, origen in enumerate(lote):
+            s = g.indice[origen]
+            alcanzado[s] |= 1 << bit
+            frontera[s] = frontera.get(s, 0) | (1 << bit)
+        for _ in range(k):
+            siguiente: Dict[int, int] = {}
+            for v, mascara in frontera.items():
+                for w in g.sucesores[v]:
+                    nuevos = mascara & ~alcanzado[w]
+                    if nuevos:
+                        alcanzado[w] |= nuevos
+                        siguiente[w] = siguiente.get(w, 0) | nuevos
+            if not siguiente:
+                break
+            frontera = siguiente
+        resultado: Dict[V, Set[V]] = {origen: set() for origen in lote}
+        for w, mascara in enumerate(alcanzado):
+            while mascara:
+                bajo = mascara & -mascara
+                bit = bajo.bit_length() - 1
+                if g.indice[lote[bit]] != w:
+                    resultado[lote[bit]].add(g.vertices[w])
+                mascara ^= bajo
+        return resultado
+
+    def amigos_comunes(self, x: V, y: V) -> Set[V]:
+        g = self._g()
+        comunes = set(g.sucesores[g.indice[x]]).intersection(g.sucesores[g.indice[y]])
+        return {g.vertices[i] for i in comunes}
+
+    def amigos_de_amigos(self, x: V) -> Dict[V, int]:
+        # Candidatos a dos saltos que aún no son vecinos de x, con su número de amigos comunes
+        g = self._g()
+        s = g.indice[x]
+        directos = set(g.sucesores[s])
+        candidatos = Counter(w for v in directos for w in g.sucesores[v] if w != s and w not in directos)
+        return {g.vertices[w]: n for w, n in candidatos.most_common()}
+
+
+#TESTS
+def test_vecindario():
+    print("Pruebas de Vecindario")
+    grafo = Grafo.of(es_dirigido=False)
+    for origen, destino in [("A", "B"), ("B", "C"), ("C", "D"), ("A", "E"), ("E", "C")]:
+        grafo.add_edge(origen, destino, 1)
+    vecindario = Vecindario.of(grafo, tam_lote=2)
+    print(f"A 2 saltos de A: {vecindario.a_distancia('A', 2)}")
+    assert vecindario.a_distancia('A', 2) == {"B", "C", "E"}
+    lote = vecindario.a_distancia_lote(["A", "D", "B"], 2)
+    assert all(lote[v] == vecindario.a_distancia(v, 2) for v in lote)
+    assert vecindario.amigos_comunes("B", "E") == {"A", "C"}
+    assert vecindario.amigos_de_amigos("A") == {"C": 2}
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_vecindario()
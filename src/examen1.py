@@ -1,6 +1,6 @@
 from math import factorial
-from collections import Counter
-import re
+from typing import Optional
+from texto.frecuencias import contar_palabras, mas_comunes, mas_comunes_aprox
 
 #EJERCICIO A
 def P2(n:int,k:int,i:int=1)->int:
@@ -44,16 +44,19 @@ def S2(n:int,k:int):
 
 #EJERCICIO D
 
-def palabrasMasComunes(fichero: str, n: int = 5) -> list[tuple[str, int]]:
+def palabrasMasComunes(fichero: str, n: int = 5, usar_mmap: bool = False, procesos: int = 1,
+                       error: Optional[float] = None) -> list[tuple[str, int]]:
+    # fichero puede ser también un directorio: se cuentan todos sus ficheros
+    # con error (por ejemplo 0.001) se usa un conteo aproximado con memoria acotada
     if n <= 1:
         raise ValueError("El número introducido debe ser mayor que 1")
-    with open(fichero) as f:
-        texto = f.read()
-    texto = texto.lower()
-    texto = re.sub(r'[^\w\s]', ' ', texto)
-    palabras = texto.split()
-    npalabras = Counter(palabras)
-    palabrascomunes = npalabras.most_common(n)
+    if error is not None:
+        # El conteo aproximado es secuencial y lee por bloques de texto: no admite procesos ni mmap
+        if procesos != 1 or usar_mmap:
+            raise ValueError("El conteo aproximado (error) no admite procesos ni usar_mmap")
+        return mas_comunes_aprox(fichero, n, error)
+    npalabras = contar_palabras(fichero, procesos, usar_mmap)
+    palabrascomunes = mas_comunes(npalabras, n)
     return palabrascomunes
 
 def test_P2():
@@ -126,6 +129,11 @@ def test_palabrasMasComunes():
         print(palabrasMasComunes('archivo_palabras.txt', 1))  # n <= 1
     except Exception as e:
         print(f"Error: {e}")
+
+    try:
+        print(palabrasMasComunes('../resources/archivo_palabras.txt', 3, procesos=2, error=0.01))  # error con procesos
+    except Exception as e:
+        print(f"Error: {e}")
     print("    ")
 
 if __name__ == "__main__":
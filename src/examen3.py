@@ -1,16 +1,25 @@
-import csv
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from representacion import resumen
 from entrega3.ENTREGA3 import Grafo
-from typing import Set, Dict
+from typing import Set, Dict, Iterable, List, Optional, Tuple
+from texto.bloques import bloques_binarios, rangos_alineados
 import networkx as nx
 import matplotlib.pyplot as plt
 
 #EJERCICIO 1
 class Gen:
+    __slots__ = ('_nombre', '_tipo', '_num_mutaciones', '_loc_cromosoma', '_hash')
+
     def __init__(self, nombre, tipo, num_mutaciones, loc_cromosoma):
         if num_mutaciones < 0:
             raise ValueError("El número de mutaciones debe ser mayor o igual que cero")
         
         self._nombre = nombre
+        self._hash = hash(nombre)
         self._tipo = tipo
         self._num_mutaciones = num_mutaciones
         self._loc_cromosoma = loc_cromosoma
@@ -56,11 +65,21 @@ class Gen:
         
         return genes
 
+    def __eq__(self, other):
+        if not isinstance(other, Gen):
+            return NotImplemented
+        return self._nombre == other._nombre
+
+    def __hash__(self):
+        return self._hash
+
     def __repr__(self):
         return f"Gen(nombre='{self.nombre}', tipo='{self.tipo}', num_mutaciones={self.num_mutaciones}, loc_cromosoma='{self.loc_cromosoma}')"
 
 #EJERCICIO 2
 class RelacionGenAGen:
+    __slots__ = ('_nombre_gen1', '_nombre_gen2', '_conexion')
+
     def __init__(self, nombre_gen1: str, nombre_gen2: str, conexion: float):
         if not (-1 <= conexion <= 1):
             raise ValueError("La conexión debe estar entre -1 y 1.")
@@ -95,60 +114,247 @@ class RelacionGenAGen:
     @staticmethod
     def parse(fichero: str):
         relaciones = []
-        with open(fichero, 'r') as file:
-            lector = csv.reader(file)
-            for fila in lector:
-                if len(fila) == 3:
-                    nombre_gen1, nombre_gen2, conexion = fila
+        with open(fichero, 'r', encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
                     try:
-                        conexion = float(conexion)
-                        relaciones.append(RelacionGenAGen.of(nombre_gen1, nombre_gen2, conexion))
-                    except ValueError:
-                        print(f"Error al convertir la conexión en la línea: {fila}")
+                        relaciones.append(RelacionGenAGen.of(*parse_linea_relacion(line)))
+                    except ValueError as e:
+                        print(f"Error en la línea {line.strip()}: {e}")
         return relaciones
 
+#Parser único de las líneas 'gen1,gen2,conexion' que comparten todas las lecturas del fichero de relaciones
+def parse_linea_relacion(line: str) -> Tuple[str, str, float]:
+    parts = line.strip().split(",")
+    if len(parts) != 3:
+        raise ValueError(f"La línea no tiene el formato correcto: {line.strip()}")
+    nombre_gen1, nombre_gen2, conexion_str = parts
+    try:
+        conexion = float(conexion_str)
+    except ValueError:
+        raise ValueError(f"El valor de conexión ('{conexion_str}') no es un número válido")
+    return nombre_gen1, nombre_gen2, conexion
+
+def _leer_conexiones(rango: Tuple[str, int, int]) -> Tuple[List[str], List[str], array]:
+    # Parsea un rango de bytes del fichero de relaciones en tres columnas
+    fichero, inicio, fin = rango
+    genes1: List[str] = []
+    genes2: List[str] = []
+    conexiones = array('d')
+    for bloque in bloques_binarios(fichero, separadores=b'\n', inicio=inicio, fin=fin):
+        for line in bloque.decode('utf-8').splitlines():
+            if line.strip():
+                nombre_gen1, nombre_gen2, conexion = parse_linea_relacion(line)
+                genes1.append(nombre_gen1)
+                genes2.append(nombre_gen2)
+                conexiones.append(conexion)
+    return genes1, genes2, conexiones
+
+#ÍNDICE DE CONEXIONES
+class IndiceConexion:
+    '''
+    Aristas ordenadas por conexión, para responder consultas por rango en
+    O(log E + k) en lugar de recorrer todas las aristas. Cada relación se indexa
+    una vez (por identidad), con el número de aristas del grafo que la usan.
+    add y remove cuestan O(1): las altas se apuntan en una lista de pendientes y
+    las bajas solo se quitan del diccionario de relaciones vivas. La siguiente
+    consulta ordena las pendientes y las mezcla con las ordenadas, descartando
+    las entradas que ya no están vivas.
+    '''
+    def __init__(self):
+        self._claves: List[float] = []
+        self._aristas: List[Tuple[Gen, Gen, RelacionGenAGen]] = []
+        self._pendientes: List[Tuple[Gen, Gen, RelacionGenAGen]] = []
+        # id(relación) -> [entrada en _aristas o _pendientes, número de aristas que la usan]
+        self._vivas: Dict[int, List] = {}
+        self._bajas: int = 0 #Entradas muertas que siguen en las listas hasta _mezclar
+
+    def add(self, origen: Gen, destino: Gen, relacion: RelacionGenAGen) -> None:
+        # Una relación que ya está indexada (en otra arista) solo suma un uso
+        viva = self._vivas.get(id(relacion))
+        if viva is not None:
+            viva[1] += 1
+            return
+        arista = (origen, destino, relacion)
+        self._vivas[id(relacion)] = [arista, 1]
+        self._pendientes.append(arista)
+
+    def add_lote(self, aristas: Iterable[Tuple[Gen, Gen, RelacionGenAGen]]) -> None:
+        for origen, destino, relacion in aristas:
+            self.add(origen, destino, relacion)
+
+    def remove(self, relacion: RelacionGenAGen) -> None:
+        # La entrada queda en las listas (y la relación viva, así que su id no se reutiliza) hasta _mezclar
+        viva = self._vivas.get(id(relacion))
+        if viva is None:
+            return
+        viva[1] -= 1
+        if viva[1] == 0:
+            del self._vivas[id(relacion)]
+            self._bajas += 1
+
+    def remove_lote(self, relaciones: Iterable[RelacionGenAGen]) -> None:
+        for relacion in relaciones:
+            self.remove(relacion)
+
+    def _mezclar(self) -> None:
+        if self._bajas:
+            # Una entrada sigue si es la que está apuntada como viva para su relación
+            # (una relación quitada y vuelta a añadir tiene una entrada nueva)
+            vivas = self._vivas
+            def viva(arista: Tuple[Gen, Gen, RelacionGenAGen]) -> bool:
+                entrada = vivas.get(id(arista[2]))
+                return entrada is not None and entrada[0] is arista
+            self._aristas = [arista for arista in self._aristas if viva(arista)]
+            self._claves = [arista[2].conexion for arista in self._aristas]
+            self._pendientes = [arista for arista in self._pendientes if viva(arista)]
+            self._bajas = 0
+        if not self._pendientes:
+            return
+        nuevas = sorted(self._pendientes, key=_conexion)
+        self._pendientes = []
+        if not self._aristas:
+            self._aristas = nuevas
+        else:
+            # Mezcla de dos listas ordenadas: O(E + k) en lugar de reordenar O(E log E)
+            self._aristas = list(merge(self._aristas, nuevas, key=_conexion))
+        self._claves = [arista[2].conexion for arista in self._aristas]
+
+    def reconstruir(self, grafo: Grafo[Gen, RelacionGenAGen]) -> None:
+        # En un grafo no dirigido cada arista aparece en los dos sentidos: se cuenta desde el
+        # primero de sus extremos que se recorre
+        self._aristas = []
+        self._claves = []
+        self._pendientes = []
+        self._vivas = {}
+        self._bajas = 0
+        recorridos: Set[Gen] = set()
+        for origen, destinos in grafo.adyacencias.items():
+            for destino, relacion in destinos.items():
+                if grafo.es_dirigido or destino not in recorridos:
+                    self.add(origen, destino, relacion)
+            recorridos.add(origen)
+        self._mezclar()
+
+    def en_rango(self, minimo: float, maximo: float) -> List[Tuple[Gen, Gen, RelacionGenAGen]]:
+        self._mezclar()
+        return self._aristas[bisect_left(self._claves, minimo):bisect_right(self._claves, maximo)]
+
+    def mayores_que(self, umbral: float) -> List[Tuple[Gen, Gen, RelacionGenAGen]]:
+        self._mezclar()
+        return self._aristas[bisect_right(self._claves, umbral):]
+
+    def menores_que(self, umbral: float) -> List[Tuple[Gen, Gen, RelacionGenAGen]]:
+        self._mezclar()
+        return self._aristas[:bisect_left(self._claves, umbral)]
+
+    def __len__(self) -> int:
+        return len(self._vivas)
+
+def _conexion(arista: Tuple[Gen, Gen, RelacionGenAGen]) -> float:
+    return arista[2].conexion
+
 #EJERCICIO 3
 class RedGenica(Grafo[Gen, RelacionGenAGen]):
     def __init__(self, es_dirigido: bool = False) -> None:
         super().__init__(es_dirigido)
         self.genes_por_nombre: Dict[str, Gen] = {}
+        self.indice: IndiceConexion = IndiceConexion()
 
     @staticmethod
     def of(es_dirigido: bool = False):
         return RedGenica(es_dirigido)
 
     @staticmethod
-    def parse(f1: str, f2: str, es_dirigido: bool = False):
+    def parse(f1: str, f2: str, es_dirigido: bool = False, procesos: int = 1):
         red_genica = RedGenica(es_dirigido)
 
         genes = Gen.parse(f1)
         for gen in genes:
-            red_genica.genes_por_nombre[gen.nombre] = gen
             red_genica.add_vertex(gen)
 
-        with open(f2, "r", encoding="utf-8") as file:
-            for line in file:
-                parts = line.strip().split(",")
-                if len(parts) != 3:
-                    raise ValueError(f"La línea no tiene el formato correcto: {line.strip()}")
-                
-                nombre_gen1, nombre_gen2, conexion_str = parts
-                try:
-                    conexion = float(conexion_str)
-                except ValueError:
-                    raise ValueError(f"El valor de conexión ('{conexion_str}') no es un número válido")
-
-                gen1 = red_genica.genes_por_nombre.get(nombre_gen1)
-                gen2 = red_genica.genes_por_nombre.get(nombre_gen2)
+        # El fichero de relaciones se reparte en rangos de líneas que se parsean en paralelo
+        rangos = [(f2, inicio, fin) for inicio, fin in rangos_alineados(f2, procesos, b'\n')]
+        if procesos > 1 and len(rangos) > 1:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                fragmentos = list(pool.map(_leer_conexiones, rangos))
+        else:
+            fragmentos = [_leer_conexiones(rango) for rango in rangos]
 
-                if gen1 and gen2:
-                    relacion = RelacionGenAGen.of(nombre_gen1, nombre_gen2, conexion)
-                    red_genica.add_edge(gen1, gen2, relacion)
+        genes_por_nombre = red_genica.genes_por_nombre
+        red_genica.add_edges((genes_por_nombre[nombre_gen1], genes_por_nombre[nombre_gen2],
+                              RelacionGenAGen.of(nombre_gen1, nombre_gen2, conexion))
+                             for genes1, genes2, conexiones in fragmentos
+                             for nombre_gen1, nombre_gen2, conexion in zip(genes1, genes2, conexiones)
+                             if nombre_gen1 in genes_por_nombre and nombre_gen2 in genes_por_nombre)
 
         return red_genica
 
+    def gen(self, nombre: str) -> Optional[Gen]:
+        return self.genes_por_nombre.get(nombre)
+
+    def add_vertex(self, gen: Gen) -> None:
+        # Un gen ya cargado con el mismo nombre no se duplica
+        if gen.nombre not in self.genes_por_nombre:
+            super().add_vertex(gen)
+            self.genes_por_nombre[gen.nombre] = gen
+
+    def add_edge(self, origen: Gen, destino: Gen, relacion: RelacionGenAGen) -> None:
+        self.add_vertex(origen)
+        self.add_vertex(destino)
+        origen = self.genes_por_nombre[origen.nombre]
+        destino = self.genes_por_nombre[destino.nombre]
+        self._indexar(origen, destino, relacion, self.edge_weight(origen, destino))
+        super().add_edge(origen, destino, relacion)
+
+    def add_edges(self, aristas) -> None:
+        # El índice se actualiza arista a arista igual que en add_edge, con la relación a la
+        # que sustituye cada una (de antes del lote o del propio lote)
+        adyacencias = self.adyacencias
+        lote = []
+        en_lote: Dict[Tuple[Gen, Gen], RelacionGenAGen] = {}
+        for origen, destino, relacion in aristas:
+            self.add_vertex(origen)
+            self.add_vertex(destino)
+            origen = self.genes_por_nombre[origen.nombre]
+            destino = self.genes_por_nombre[destino.nombre]
+            anterior = en_lote.get((origen, destino))
+            self._indexar(origen, destino, relacion, anterior if anterior is not None else adyacencias[origen].get(destino))
+            en_lote[(origen, destino)] = relacion
+            if not self.es_dirigido:
+                en_lote[(destino, origen)] = relacion
+            lote.append((origen, destino, relacion))
+        super().add_edges(lote)
+
+    def _indexar(self, origen: Gen, destino: Gen, relacion: RelacionGenAGen,
+                 anterior: Optional[RelacionGenAGen]) -> None:
+        # Volver a añadir la misma relación en la misma arista no cambia el índice
+        if anterior is relacion:
+            return
+        if anterior is not None:
+            self.indice.remove(anterior)
+        self.indice.add(origen, destino, relacion)
+
+    def aristas_en_rango(self, minimo: float, maximo: float) -> List[Tuple[Gen, Gen, RelacionGenAGen]]:
+        return self.indice.en_rango(minimo, maximo)
+
+    def coexpresados(self) -> List[Tuple[Gen, Gen, RelacionGenAGen]]:
+        return self.indice.mayores_que(0.7)
+
+    def antiexpresados(self) -> List[Tuple[Gen, Gen, RelacionGenAGen]]:
+        return self.indice.menores_que(0.7)
+
+    def subgrafo_en_rango(self, minimo: float, maximo: float) -> RedGenica:
+        subgrafo = RedGenica(self.es_dirigido)
+        for origen, destino, relacion in self.aristas_en_rango(minimo, maximo):
+            subgrafo.add_edge(origen, destino, relacion)
+        return subgrafo
+
     def __repr__(self):
-        return f"RedGenica(es_dirigido={self.es_dirigido}, genes={list(self.genes_por_nombre.values())}, adyacencias={self.adyacencias})"
+        # Resumen con los primeros genes; write_to(fh) escribe la red completa
+        genes = resumen(map(repr, self.genes_por_nombre.values()), len(self.genes_por_nombre))
+        return (f"RedGenica(es_dirigido={self.es_dirigido}, num_genes={len(self.genes_por_nombre)}, "
+                f"num_aristas={self.num_aristas()}, genes=[{genes}])")
 
 
 #TESTS
@@ -170,14 +376,57 @@ def test_parse2():
         print(f"Antiexpresados: {rel.antiexpresados}")
         print(" ")
 
-if __name__ == "__main__":
-    test_parse1()
-    print(" ")
-    test_parse2()
-    
-red_genica = RedGenica.parse("genes.csv", "red_genes.csv", es_dirigido=False)
-kras = red_genica.genes_por_nombre.get("KRAS")
-pik3ca = red_genica.genes_por_nombre.get("PIK3CA")
+def test_add_edges():
+    print("Pruebas de RedGenica.add_edges")
+    genes = [Gen.of(f"G{i}", "oncogen", i, "1p1") for i in range(6)]
+    relaciones = [(0, 1, 0.9), (1, 2, -0.5), (2, 3, 0.1), (0, 1, 0.2), (3, 4, 0.8),
+                  (4, 5, -0.9), (1, 0, 0.75), (5, 0, 0.3), (2, 3, 0.1)]
+    aristas = [(genes[i], genes[j], RelacionGenAGen.of(genes[i].nombre, genes[j].nombre, c)) for i, j, c in relaciones]
+    aristas.append(aristas[2])  # la misma relación otra vez
+    uno_a_uno = RedGenica.of()
+    for origen, destino, relacion in aristas:
+        uno_a_uno.add_edge(origen, destino, relacion)
+    esperado = [a[2] for a in uno_a_uno.aristas_en_rango(-1, 1)]
+    for tam_lote in (len(aristas), 4, 1):
+        por_lotes = RedGenica.of()
+        for i in range(0, len(aristas), tam_lote):
+            por_lotes.add_edges(aristas[i:i + tam_lote])
+        assert por_lotes.adyacencias == uno_a_uno.adyacencias
+        obtenido = [a[2] for a in por_lotes.aristas_en_rango(-1, 1)]
+        assert sorted(map(id, obtenido)) == sorted(map(id, esperado)), tam_lote
+        assert [r.conexion for r in obtenido] == sorted(r.conexion for r in esperado)
+        assert len(por_lotes.indice) == len(esperado) == 6
+    # add_edge y add_edges indexan cada relación una vez, aunque esté en varias aristas, y
+    # dejan el mismo índice que reconstruirlo desde el grafo
+    import random
+    aleatorio = random.Random(0)
+    compartidas = [RelacionGenAGen.of("G0", "G1", aleatorio.uniform(-1, 1)) for _ in range(5)]
+    for es_dirigido in (True, False):
+        aristas = []
+        for _ in range(300):
+            i, j = aleatorio.randrange(6), aleatorio.randrange(6)
+            relacion = aleatorio.choice(compartidas) if aleatorio.random() < 0.3 else \
+                RelacionGenAGen.of(genes[i].nombre, genes[j].nombre, aleatorio.uniform(-1, 1))
+            aristas.append((genes[i], genes[j], relacion))
+        redes = [RedGenica.of(es_dirigido) for _ in range(3)]
+        for k, (origen, destino, relacion) in enumerate(aristas):
+            redes[0].add_edge(origen, destino, relacion)
+            if k % 37 == 0:
+                redes[0].coexpresados() #Consultas intercaladas con las altas
+        for tam_lote in (1, 50):
+            red = redes[1 if tam_lote == 1 else 2]
+            for i in range(0, len(aristas), tam_lote):
+                red.add_edges(aristas[i:i + tam_lote])
+        reconstruido = IndiceConexion()
+        reconstruido.reconstruir(redes[0])
+        esperado = sorted(id(a[2]) for a in reconstruido.en_rango(-1, 1))
+        assert len(esperado) == len(set(esperado)) == len(reconstruido)
+        for red in redes:
+            obtenido = red.aristas_en_rango(-1, 1)
+            assert sorted(id(a[2]) for a in obtenido) == esperado, es_dirigido
+            assert [a[2].conexion for a in obtenido] == sorted(a[2].conexion for a in obtenido)
+            assert len(red.indice) == len(esperado)
+    print("Pruebas superadas exitosamente.")
 
 def dfs(graph, start, goal, path=None):
     if path is None:
@@ -193,6 +442,17 @@ def dfs(graph, start, goal, path=None):
             if new_path:
                 return new_path
     return None
+
+if __name__ == "__main__":
+    test_parse1()
+    print(" ")
+    test_parse2()
+    test_add_edges()
+
+    # Fuera del bloque principal se ejecutaría también en cada proceso del cargador paralelo
+    red_genica = RedGenica.parse("genes.csv", "red_genes.csv", es_dirigido=False)
+    kras = red_genica.genes_por_nombre.get("KRAS")
+    pik3ca = red_genica.genes_por_nombre.get("PIK3CA")
     dfs_path = dfs(red_genica, kras, pik3ca)
     print(f"Recorrido DFS desde KRAS hasta PIK3CA: {dfs_path}")
 
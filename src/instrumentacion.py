@@ -0,0 +1,149 @@
+'''
+Instrumentación opcional: contadores, tiempos por fase e histogramas.
+
+Está desactivada por defecto (o activada con la variable de entorno
+INSTRUMENTACION=1). Los puntos instrumentados comprueban primero
+instrumentacion.ACTIVA, así que desactivada solo cuesta leer un atributo.
+Los datos se pueden volcar a JSON o al formato de texto de Prometheus.
+'''
+
+from __future__ import annotations
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Dict, Iterator, List, Sequence, Tuple, Any
+import json
+import os
+import re
+
+ACTIVA: bool = os.environ.get("INSTRUMENTACION") == "1"
+
+#Límites superiores (en segundos) de los cubos de los histogramas de tiempos
+CUBOS: Tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+#HISTOGRAMA
+class Histograma:
+    __slots__ = ('cubos', 'cuentas', 'n', 'suma')
+
+    def __init__(self, cubos: Sequence[float] = CUBOS):
+        self.cubos: Tuple[float, ...] = tuple(cubos)
+        self.cuentas: List[int] = [0] * (len(self.cubos) + 1) #El último cubo es +Inf
+        self.n: int = 0
+        self.suma: float = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.cuentas[bisect_left(self.cubos, valor)] += 1
+        self.n += 1
+        self.suma += valor
+
+    def acumulado(self) -> List[Tuple[float, int]]:
+        # Pares (límite, observaciones <= límite) como los buckets de Prometheus
+        total = 0
+        resultado = []
+        for limite, cuenta in zip(self.cubos + (float('inf'),), self.cuentas):
+            total += cuenta
+            resultado.append((limite, total))
+        return resultado
+
+    def __repr__(self) -> str:
+        return f"Histograma(n={self.n}, suma={self.suma:.6f})"
+
+#REGISTRO
+contadores: Dict[str, int] = {}
+histogramas: Dict[str, Histograma] = {}
+
+def activar(activa: bool = True) -> None:
+    global ACTIVA
+    ACTIVA = activa
+
+def reiniciar() -> None:
+    contadores.clear()
+    histogramas.clear()
+
+def incrementar(nombre: str, n: int = 1) -> None:
+    contadores[nombre] = contadores.get(nombre, 0) + n
+
+def observar(nombre: str, valor: float) -> None:
+    histograma = histogramas.get(nombre)
+    if histograma is None:
+        histograma = histogramas[nombre] = Histograma()
+    histograma.observar(valor)
+
+@contextmanager
+def _medir(nombre: str) -> Iterator[None]:
+    inicio = perf_counter()
+    try:
+        yield
+    finally:
+        observar(nombre, perf_counter() - inicio)
+
+def medir(nombre: str):
+    # Con la instrumentación desactivada no se toma ningún tiempo
+    return _medir(nombre) if ACTIVA else nullcontext()
+
+def instantanea() -> Dict[str, Any]:
+    return {
+        "contadores": dict(contadores),
+        "histogramas": {nombre: {"n": h.n, "suma": h.suma,
+                                 "cubos": [[limite if limite != float('inf') else "+Inf", cuenta]
+                                           for limite, cuenta in h.acumulado()]}
+                        for nombre, h in histogramas.items()},
+    }
+
+#EXPORTADORES
+def exportar_json(fichero: str) -> None:
+    with open(fichero, 'w', encoding='utf-8') as f:
+        json.dump(instantanea(), f, indent=2, ensure_ascii=False)
+
+def _nombre_prometheus(nombre: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', nombre)
+
+def texto_prometheus() -> str:
+    lineas = []
+    for nombre, valor in sorted(contadores.items()):
+        metrica = _nombre_prometheus(nombre) + "_total"
+        lineas.append(f"# TYPE {metrica} counter")
+        lineas.append(f"{metrica} {valor}")
+    for nombre, h in sorted(histogramas.items()):
+        metrica = _nombre_prometheus(nombre) + "_segundos"
+        lineas.append(f"# TYPE {metrica} histogram")
+        for limite, cuenta in h.acumulado():
+            le = "+Inf" if limite == float('inf') else repr(limite)
+            lineas.append(f'{metrica}_bucket{{le="{le}"}} {cuenta}')
+        lineas.append(f"{metrica}_sum {h.suma}")
+        lineas.append(f"{metrica}_count {h.n}")
+    return "\n".join(lineas) + "\n"
+
+def exportar_prometheus(fichero: str) -> None:
+    with open(fichero, 'w', encoding='utf-8') as f:
+        f.write(texto_prometheus())
+
+#PRUEBAS
+def test_instrumentacion():
+    print("Pruebas de instrumentación")
+    anterior = ACTIVA
+    activar()
+    reiniciar()
+    incrementar("prueba.operaciones")
+    incrementar("prueba.operaciones", 2)
+    with medir("prueba.fase"):
+        sum(range(1000))
+    observar("prueba.fase", 20.0)
+    assert contadores["prueba.operaciones"] == 3
+    assert histogramas["prueba.fase"].n == 2
+    assert histogramas["prueba.fase"].acumulado()[-1] == (float('inf'), 2)
+    assert histogramas["prueba.fase"].acumulado()[-2] == (10.0, 1)
+    texto = texto_prometheus()
+    assert "prueba_operaciones_total 3" in texto
+    assert 'prueba_fase_segundos_bucket{le="+Inf"} 2' in texto
+    print(texto)
+    activar(False)
+    with medir("prueba.desactivada"):
+        pass
+    assert "prueba.desactivada" not in histogramas
+    reiniciar()
+    activar(anterior)
+    print("Todas las pruebas de instrumentación han pasado.")
+
+if __name__ == '__main__':
+    test_instrumentacion()
@@ -1,14 +1,22 @@
 #EJERCICIO 6
-from _csv import reader
+from hashlib import blake2b
+from math import log
+import os
+import sys
+
+if __package__ in (None, ''):
+    # Ejecutado como script (python lecturas.py): src tiene que estar en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from texto.tokenizador import tokens_fichero
+from texto.estadisticas import estadisticas_fichero
+from texto.aho_corasick import AhoCorasick
 
 def contador(fichero:str, sep:str,cad:str)-> int:
     palabra:int = 0
-    with open(fichero) as f:
-        lector= reader(f, delimiter=sep)
-        for n in lector:
-            for y in n:
-                if y == cad:
-                    palabra = palabra + 1
+    for y in tokens_fichero(fichero, puntuacion=True, separador=sep):
+        if y == cad:
+            palabra = palabra + 1
     return(palabra)
 
 
@@ -23,37 +31,96 @@ def lineas_con_palabra(fichero:str, palabra:str) -> list[str]:
     return(lista)
 
 
+#Búsqueda de muchas palabras a la vez en una sola pasada (Aho-Corasick)
+#Para cada palabra devuelve (número de línea, posición en bytes de la coincidencia, línea)
+def lineas_con_palabras(fichero:str, palabras:list[str], ignorar_mayusculas:bool = False) -> dict[str, list[tuple[int, int, str]]]:
+    palabras = list(dict.fromkeys(palabras))
+    buscadas = [p.lower() for p in palabras] if ignorar_mayusculas else palabras
+    automata = AhoCorasick.of(buscadas)
+    resultado:dict[str, list[tuple[int, int, str]]] = {p: [] for p in palabras}
+    posicion:int = 0
+    with open(fichero, 'rb') as f:
+        for numero, datos in enumerate(f, start=1):
+            linea = datos.decode('utf-8')
+            texto = linea.lower() if ignorar_mayusculas else linea
+            origen = None
+            if len(texto) != len(linea): #Algún carácter crece al pasarlo a minúsculas ('İ' -> 'i̇')
+                origen = [i for i, c in enumerate(linea) for _ in c.lower()]
+            vistas = set()
+            for inicio, indice in automata.buscar(texto):
+                if indice not in vistas: #Solo la primera coincidencia de cada palabra en la línea
+                    vistas.add(indice)
+                    if origen is not None:
+                        inicio = origen[inicio] #Posición en la línea original
+                    desplazamiento = inicio if linea.isascii() else len(linea[:inicio].encode('utf-8'))
+                    resultado[palabras[indice]].append((numero, posicion + desplazamiento, linea.strip()))
+            posicion += len(datos)
+    return(resultado)
+
+
 
 #EJERCICIO 8
 def palabras_fichero(fichero:str) -> list[str]:
-    lista = []
-    with open(fichero) as f:
-        lector= reader(f, delimiter=' ')
-        for n in lector:
-            for y in n:
-                if (y not in lista) and (y != ''):
-                    lista.append(y)
-    return(lista)
+    vistas:dict[str, None] = {} #Un diccionario conserva el orden de inserción y comprueba en O(1)
+    for y in tokens_fichero(fichero, puntuacion=True, separador=' '):
+        vistas.setdefault(y)
+    return(list(vistas))
+
+
+#Cuenta aproximada de palabras distintas con HyperLogLog: memoria fija de 2**precision bytes
+def numero_palabras_distintas(fichero:str, precision:int = 14) -> int:
+    if not 4 <= precision <= 18:
+        raise ValueError("La precisión debe estar entre 4 y 18")
+    m:int = 1 << precision
+    registros = bytearray(m)
+    for y in tokens_fichero(fichero, puntuacion=True, separador=' '):
+        h = int.from_bytes(blake2b(y.encode(), digest_size=8).digest(), 'big')
+        indice = h >> (64 - precision)
+        resto = h & ((1 << (64 - precision)) - 1)
+        rango = (64 - precision) - resto.bit_length() + 1
+        if rango > registros[indice]:
+            registros[indice] = rango
+    alfa = 0.7213/(1 + 1.079/m)
+    estimacion = alfa*m*m/sum(2.0**-r for r in registros)
+    ceros = registros.count(0)
+    if estimacion <= 2.5*m and ceros > 0:
+        estimacion = m*log(m/ceros) #Corrección para cardinalidades pequeñas
+    return(round(estimacion))
 
 
 
 #EJERCICIO 9
 def longitud_promedio_lineas(file_path: str, sep:str) -> float:
-    lista = []
-    i:int = 0
-    with open(file_path) as f:
-        lector= reader((linea.strip() for linea in f), delimiter=sep)
-        for n in lector:
-            i = 0
-            for y in n:
-                i= i + 1
-            lista.append(i)
-    final= sum(lista)/len(lista)
-    return(final)
+    campos, _ = estadisticas_fichero(file_path, sep)
+    return(campos.media) #0.0 si el fichero está vacío
+
+
+#TESTS
+def test_lineas_con_palabras():
+    import tempfile
+    print("Pruebas de lineas_con_palabras")
+    contenido = "Don Quijote\nİstanbul, QUIJOTE y la Mancha\nÁlvaro en la mancha\n".encode('utf-8')
+    with tempfile.TemporaryDirectory() as directorio:
+        fichero = os.path.join(directorio, "texto.txt")
+        with open(fichero, 'wb') as f:
+            f.write(contenido)
+        resultado = lineas_con_palabras(fichero, ['quijote', 'mancha'], ignorar_mayusculas=True)
+    for palabra, apariciones in resultado.items():
+        for numero, posicion, linea in apariciones:
+            #La posición apunta a los bytes del fichero aunque lower() cambie la longitud de la línea
+            assert contenido[posicion:posicion + len(palabra)].decode('utf-8').lower() == palabra, (palabra, posicion)
+    assert [n for n, _, _ in resultado['quijote']] == [1, 2]
+    assert [n for n, _, _ in resultado['mancha']] == [2, 3]
+    print("Pruebas superadas exitosamente.")
 
 
 if __name__ == '__main__':
+    test_lineas_con_palabras()
     print(contador('../../resources/lin_quijote.txt',' ','Quijote')) #La función es sensible a mayúsculas y minúsculas
     print(lineas_con_palabra('../../resources/lin_quijote.txt', 'QUIJOTE')) #La función es sensible a mayúsculas y minúsculas
+    print(lineas_con_palabras('../../resources/lin_quijote.txt', ['quijote', 'mancha', 'hidalgo'], ignorar_mayusculas=True))
     print(palabras_fichero('../../resources/archivo_palabras.txt'))
+    print(numero_palabras_distintas('../../resources/archivo_palabras.txt'))
     print(longitud_promedio_lineas('../../resources/palabras_random.csv', ','))
+    print(longitud_promedio_lineas('../../resources/vacio.csv', ','))
+    print(estadisticas_fichero('../../resources/palabras_random.csv', ',')[0])
@@ -0,0 +1,28 @@
+'''
+Representación abreviada de colecciones grandes para __str__ y __repr__: solo
+se muestran los primeros MAX_REPR elementos y cuántos faltan. Los métodos
+write_to de cada tipo escriben la colección completa.
+'''
+
+from itertools import islice
+from typing import Iterable, Optional
+
+MAX_REPR: int = 10
+
+def resumen(textos: Iterable[str], total: int, limite: Optional[int] = MAX_REPR) -> str:
+    # Con limite None se unen todos los textos
+    texto = ", ".join(islice(textos, limite))
+    if limite is not None and total > limite:
+        texto += f", ... (+{total - limite} más)"
+    return texto
+
+#PRUEBAS
+def test_resumen():
+    print("Pruebas de resumen")
+    assert resumen(map(str, range(3)), 3) == "0, 1, 2"
+    assert resumen(map(str, range(25)), 25, 2) == "0, 1, ... (+23 más)"
+    assert resumen(map(str, range(25)), 25, None).count(",") == 24
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_resumen()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+#AUTÓMATA DE AHO-CORASICK
+class AhoCorasick:
+    '''
+    Autómata que busca todas las palabras a la vez en una sola pasada por el texto:
+    el coste es O(len(texto) + coincidencias) independientemente del número de palabras.
+    '''
+    def __init__(self, palabras: Iterable[str]):
+        self.palabras: List[str] = []
+        self._transiciones: List[Dict[str, int]] = [{}]
+        self._fallo: List[int] = [0]
+        self._salidas: List[List[int]] = [[]]
+        for palabra in palabras:
+            if not palabra:
+                raise ValueError("Las palabras a buscar no pueden estar vacías")
+            self._insertar(palabra)
+        self._construir_fallos()
+
+    @staticmethod
+    def of(palabras: Iterable[str]) -> AhoCorasick:
+        return AhoCorasick(palabras)
+
+    def _insertar(self, palabra: str) -> None:
+        estado = 0
+        for c in palabra:
+            siguiente = self._transiciones[estado].get(c)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[estado][c] = siguiente
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append([])
+            estado = siguiente
+        self._salidas[estado].append(len(self.palabras))
+        self.palabras.append(palabra)
+
+    def _construir_fallos(self) -> None:
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for c, hijo in self._transiciones[estado].items():
+                cola.append(hijo)
+                fallo = self._fallo[estado]
+                while fallo and c not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                self._fallo[hijo] = self._transiciones[fallo].get(c, 0)
+                # Las salidas del estado de fallo también terminan aquí
+                self._salidas[hijo].extend(self._salidas[self._fallo[hijo]])
+
+    def buscar(self, texto: str) -> Iterator[Tuple[int, int]]:
+        '''Devuelve pares (posición de inicio, índice de la palabra) de cada coincidencia.'''
+        transiciones, fallo, salidas, palabras = self._transiciones, self._fallo, self._salidas, self.palabras
+        estado = 0
+        for i, c in enumerate(texto):
+            while estado and c not in transiciones[estado]:
+                estado = fallo[estado]
+            estado = transiciones[estado].get(c, 0)
+            for indice in salidas[estado]:
+                yield i - len(palabras[indice]) + 1, indice
+
+
+#TESTS
+def test_aho_corasick():
+    print("Pruebas de AhoCorasick")
+    automata = AhoCorasick.of(['he', 'she', 'his', 'hers'])
+    encontradas = sorted((pos, automata.palabras[i]) for pos, i in automata.buscar('ushers'))
+    print(encontradas)
+    assert encontradas == [(1, 'she'), (2, 'he'), (2, 'hers')]
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_aho_corasick()
@@ -0,0 +1,110 @@
+from mmap import mmap, ACCESS_READ
+from typing import Iterator, Tuple, List
+import os
+
+ESPACIOS: bytes = b' \t\n\r\x0b\x0c'
+TAM_BLOQUE: int = 1 << 20
+
+#BLOQUES BINARIOS
+def _ultimo_separador(datos, inicio: int, fin: int, separadores: bytes) -> int:
+    return max(datos.rfind(s, inicio, fin) for s in (separadores[i:i + 1] for i in range(len(separadores))))
+
+def bloques_binarios(fichero: str, tam_bloque: int = TAM_BLOQUE, usar_mmap: bool = False,
+                     separadores: bytes = ESPACIOS, inicio: int = 0, fin: int = -1) -> Iterator[bytes]:
+    '''
+    Lee el fichero en bloques de tamaño fijo que siempre terminan en un separador,
+    de forma que ninguna palabra queda partida entre dos bloques.
+    La memoria usada no depende del tamaño del fichero sino de tam_bloque.
+    '''
+    if tam_bloque <= 0:
+        raise ValueError("El tamaño de bloque debe ser mayor que 0")
+    with open(fichero, 'rb') as f:
+        if fin < 0:
+            fin = os.fstat(f.fileno()).st_size
+        if fin <= inicio:
+            return
+        if usar_mmap:
+            with mmap(f.fileno(), 0, access=ACCESS_READ) as datos:
+                pos = inicio
+                while pos < fin:
+                    limite = min(pos + tam_bloque, fin)
+                    if limite < fin:
+                        corte = _ultimo_separador(datos, pos, limite, separadores)
+                        limite = corte + 1 if corte >= pos else _siguiente_corte(datos, limite, fin, separadores)
+                    yield datos[pos:limite]
+                    pos = limite
+        else:
+            f.seek(inicio)
+            pendiente = b''
+            restante = fin - inicio
+            while restante > 0:
+                bloque = f.read(min(tam_bloque, restante))
+                if not bloque:
+                    break
+                restante -= len(bloque)
+                bloque = pendiente + bloque
+                corte = _ultimo_separador(bloque, 0, len(bloque), separadores)
+                if corte < 0:
+                    pendiente = bloque #No hay separador: la palabra continúa en el siguiente bloque
+                    continue
+                pendiente = bloque[corte + 1:]
+                yield bloque[:corte + 1]
+            if pendiente:
+                yield pendiente
+
+def _siguiente_corte(datos, pos: int, fin: int, separadores: bytes) -> int:
+    while pos < fin and datos[pos] not in separadores:
+        pos += 1
+    return min(pos + 1, fin)
+
+#RANGOS ALINEADOS
+def rangos_alineados(fichero: str, partes: int, separadores: bytes = ESPACIOS) -> List[Tuple[int, int]]:
+    '''
+    Divide el fichero en como mucho 'partes' rangos de bytes [inicio, fin) cuyos
+    límites caen justo después de un separador, para procesarlos por separado.
+    '''
+    if partes <= 0:
+        raise ValueError("El número de partes debe ser mayor que 0")
+    tamano = os.path.getsize(fichero)
+    cortes = [0]
+    with open(fichero, 'rb') as f:
+        for i in range(1, partes):
+            pos = max(tamano * i // partes, cortes[-1])
+            f.seek(pos)
+            while pos < tamano:
+                ventana = f.read(1 << 16)
+                if not ventana:
+                    pos = tamano
+                    break
+                corte = min((c for c in (ventana.find(s) for s in (separadores[j:j + 1] for j in range(len(separadores)))) if c >= 0),
+                            default=-1)
+                if corte >= 0:
+                    pos += corte + 1
+                    break
+                pos += len(ventana)
+            cortes.append(min(pos, tamano))
+    cortes.append(tamano)
+    return [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+
+#BLOQUES DE TEXTO
+def bloques_texto(fichero: str, tam_bloque: int = TAM_BLOQUE, usar_mmap: bool = False,
+                  encoding: str = 'utf-8') -> Iterator[str]:
+    # Cortar siempre en un espacio ASCII garantiza que no se parte ningún carácter UTF-8
+    for bloque in bloques_binarios(fichero, tam_bloque, usar_mmap):
+        yield bloque.decode(encoding)
+
+
+#TESTS
+def test_bloques_texto():
+    print("Pruebas de bloques_texto")
+    fichero = '../../resources/lin_quijote.txt'
+    with open(fichero, encoding='utf-8') as f:
+        esperado = f.read().split()
+    for usar_mmap in (False, True):
+        for tam in (1, 7, 64, TAM_BLOQUE):
+            palabras = [p for b in bloques_texto(fichero, tam, usar_mmap) for p in b.split()]
+            assert palabras == esperado, f"Bloques de tamaño {tam} (mmap={usar_mmap}) parten palabras"
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_bloques_texto()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from collections import Counter
+from math import sqrt, inf
+from typing import Dict, Iterable, Tuple
+
+#ESTADÍSTICAS
+class Estadisticas:
+    '''
+    Acumulador de una sola pasada: media, varianza (Welford), mínimo, máximo e
+    histograma de valores. Usa memoria constante salvo el histograma, que solo
+    se rellena si se pide.
+    '''
+    def __init__(self, con_histograma: bool = False):
+        self.n: int = 0
+        self.suma: float = 0
+        self._media: float = 0.0
+        self._m2: float = 0.0
+        self.minimo: float = inf
+        self.maximo: float = -inf
+        self.invalidos: int = 0
+        self.histograma: Counter = Counter() if con_histograma else None
+
+    @staticmethod
+    def of(con_histograma: bool = False) -> Estadisticas:
+        return Estadisticas(con_histograma)
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        self.suma += x
+        delta = x - self._media
+        self._media += delta / self.n
+        self._m2 += delta * (x - self._media)
+        if x < self.minimo:
+            self.minimo = x
+        if x > self.maximo:
+            self.maximo = x
+        if self.histograma is not None:
+            self.histograma[x] += 1
+
+    def add_all(self, ls: Iterable[float]) -> None:
+        for x in ls:
+            self.add(x)
+
+    @property
+    def media(self) -> float:
+        return self.suma / self.n if self.n > 0 else 0.0
+
+    @property
+    def varianza(self) -> float:
+        return self._m2 / self.n if self.n > 0 else 0.0
+
+    @property
+    def desviacion(self) -> float:
+        return sqrt(self.varianza)
+
+    def __repr__(self) -> str:
+        if self.n == 0:
+            return "Estadisticas(n=0)"
+        return (f"Estadisticas(n={self.n}, media={self.media:.4f}, varianza={self.varianza:.4f}, "
+                f"minimo={self.minimo}, maximo={self.maximo})")
+
+def estadisticas_fichero(file_path: str, sep: str, columnas: Iterable[int] = (),
+                         encoding: str = 'utf-8') -> Tuple[Estadisticas, Dict[int, Estadisticas]]:
+    '''
+    Recorre el fichero una sola vez y devuelve las estadísticas del número de campos
+    por línea (con histograma) y las de cada columna numérica pedida. Los valores
+    que faltan o no son números se cuentan en 'invalidos'.
+    '''
+    campos = Estadisticas(con_histograma=True)
+    por_columna = {c: Estadisticas() for c in columnas}
+    with open(file_path, encoding=encoding) as f:
+        for linea in f:
+            linea = linea.strip()
+            # Contar separadores evita crear la lista de campos si no hay columnas que leer
+            campos.add(linea.count(sep) + 1 if linea else 0)
+            if por_columna:
+                valores = linea.split(sep)
+                for c, estadisticas in por_columna.items():
+                    try:
+                        estadisticas.add(float(valores[c]))
+                    except (IndexError, ValueError):
+                        estadisticas.invalidos += 1
+    return campos, por_columna
+
+
+#TESTS
+def test_estadisticas():
+    print("Pruebas de Estadisticas")
+    e = Estadisticas.of(con_histograma=True)
+    e.add_all([2, 4, 4, 4, 5, 5, 7, 9])
+    print(e)
+    assert e.media == 5 and e.varianza == 4 and e.minimo == 2 and e.maximo == 9
+    assert e.histograma[4] == 3
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_estadisticas()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from heapq import nlargest, heapify, heappush, heappop
+from math import ceil
+from typing import Dict, Iterable, List, Tuple, Union
+from time import perf_counter
+import os
+import random
+import sys
+import tempfile
+
+if __package__ in (None, ''):
+    # Ejecutado como script (python frecuencias.py): src tiene que estar en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from texto.bloques import bloques_binarios, bloques_texto, rangos_alineados, TAM_BLOQUE
+from texto.tokenizador import palabras
+
+#CONTEO
+def contar_texto(texto: str, contador: Counter) -> None:
+    # texto es un bloque acotado: la lista de palabras se crea de golpe, que es más rápido que tokens
+    contador.update(palabras(texto, minusculas=True))
+
+def _contar_rango(args: Tuple[str, int, int, bool]) -> Counter:
+    fichero, inicio, fin, usar_mmap = args
+    contador = Counter()
+    for bloque in bloques_binarios(fichero, TAM_BLOQUE, usar_mmap, inicio=inicio, fin=fin):
+        contar_texto(bloque.decode('utf-8'), contador)
+    return contador
+
+def _ficheros(ruta: str) -> List[str]:
+    if os.path.isdir(ruta):
+        return sorted(os.path.join(ruta, nombre) for nombre in os.listdir(ruta)
+                      if os.path.isfile(os.path.join(ruta, nombre)))
+    return [ruta]
+
+def contar_palabras(ruta: str, procesos: int = 1, usar_mmap: bool = False) -> Counter:
+    '''
+    Cuenta las palabras de un fichero o de todos los ficheros de un directorio.
+    Con procesos > 1 cada fichero se divide en rangos alineados a espacios que se
+    cuentan en paralelo (map) y cuyos contadores se suman en orden (reduce).
+    '''
+    if procesos <= 0:
+        raise ValueError("El número de procesos debe ser mayor que 0")
+    tareas = [(fichero, inicio, fin, usar_mmap)
+              for fichero in _ficheros(ruta)
+              for inicio, fin in rangos_alineados(fichero, procesos)]
+    total = Counter()
+    if procesos == 1 or len(tareas) <= 1:
+        for tarea in tareas:
+            total.update(_contar_rango(tarea))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            for parcial in pool.map(_contar_rango, tareas):
+                total.update(parcial)
+    return total
+
+def mas_comunes(contador: Counter, n: int) -> List[Tuple[str, int]]:
+    # Montículo de tamaño n: O(V log n) en lugar de ordenar todo el vocabulario
+    return nlargest(n, contador.items(), key=lambda par: par[1])
+
+
+#PALABRAS FRECUENTES APROXIMADAS (SPACE-SAVING)
+class SpaceSaving:
+    '''
+    Mantiene como mucho 'capacidad' contadores. Cualquier palabra con frecuencia
+    mayor que total/capacidad está garantizada en el resumen, y cada contador
+    sobreestima la frecuencia real en como mucho total/capacidad.
+    '''
+    def __init__(self, capacidad: int):
+        if capacidad <= 0:
+            raise ValueError("La capacidad debe ser mayor que 0")
+        self.capacidad: int = capacidad
+        self.total: int = 0
+        self._contadores: Dict[str, int] = {}
+        self._errores: Dict[str, int] = {}
+        self._monticulo: List[Tuple[int, str]] = []
+
+    @staticmethod
+    def of(error: float = 0.001) -> SpaceSaving:
+        if not 0 < error < 1:
+            raise ValueError("El error debe estar entre 0 y 1")
+        return SpaceSaving(ceil(1 / error))
+
+    def add(self, palabra: str) -> None:
+        self.total += 1
+        contadores = self._contadores
+        if palabra in contadores:
+            contadores[palabra] += 1
+        elif len(contadores) < self.capacidad:
+            contadores[palabra] = 1
+            self._errores[palabra] = 0
+        else:
+            minimo, victima = self._minimo()
+            del contadores[victima]
+            del self._errores[victima]
+            contadores[palabra] = minimo + 1
+            self._errores[palabra] = minimo
+        heappush(self._monticulo, (contadores[palabra], palabra))
+        if len(self._monticulo) > 4 * self.capacidad:
+            self._compactar()
+
+    def add_all(self, palabras: Iterable[str]) -> None:
+        for palabra in palabras:
+            self.add(palabra)
+
+    def _minimo(self) -> Tuple[int, str]:
+        # El montículo guarda entradas obsoletas; se descartan hasta dar con una vigente
+        while True:
+            cuenta, palabra = self._monticulo[0]
+            if self._contadores.get(palabra) == cuenta:
+                return cuenta, palabra
+            heappop(self._monticulo)
+
+    def _compactar(self) -> None:
+        self._monticulo = [(c, p) for p, c in self._contadores.items()]
+        heapify(self._monticulo)
+
+    def error(self, palabra: str) -> int:
+        return self._errores.get(palabra, 0)
+
+    def most_common(self, n: int) -> List[Tuple[str, int]]:
+        return nlargest(n, self._contadores.items(), key=lambda par: par[1])
+
+def mas_comunes_aprox(fuente: Union[str, Iterable[str]], n: int, error: float = 0.001) -> List[Tuple[str, int]]:
+    '''
+    Palabras más frecuentes de un fichero o directorio (ruta) o de un iterable de líneas
+    usando memoria acotada por 1/error contadores.
+    '''
+    resumen = SpaceSaving.of(error)
+    textos = (t for f in _ficheros(fuente) for t in bloques_texto(f)) if isinstance(fuente, str) else fuente
+    for texto in textos:
+        resumen.add_all(palabras(texto, minusculas=True))
+    return resumen.most_common(n)
+
+
+#BENCHMARK
+def _corpus_sintetico(ruta: str, megas: int, semilla: int = 0) -> None:
+    aleatorio = random.Random(semilla)
+    vocabulario = [f"palabra{i}" for i in range(50000)]
+    pesos = [1 / (i + 1) for i in range(len(vocabulario))]
+    with open(ruta, 'w', encoding='utf-8') as f:
+        escrito = 0
+        while escrito < megas << 20:
+            linea = ' '.join(aleatorio.choices(vocabulario, pesos, k=2000)) + '.\n'
+            f.write(linea)
+            escrito += len(linea)
+
+def benchmark_paralelo(megas: int = 200) -> None:
+    print(f"Benchmark de contar_palabras sobre un corpus sintético de {megas} MB")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'corpus.txt')
+        _corpus_sintetico(ruta, megas)
+        base = None
+        procesos = 1
+        while procesos <= (os.cpu_count() or 1):
+            inicio = perf_counter()
+            mas_comunes(contar_palabras(ruta, procesos), 10)
+            tiempo = perf_counter() - inicio
+            base = base or tiempo
+            print(f"{procesos} procesos: {tiempo:.2f} s (aceleración x{base / tiempo:.2f})")
+            procesos *= 2
+
+#TESTS
+def test_space_saving():
+    print("Pruebas de SpaceSaving")
+    resumen = SpaceSaving(3)
+    resumen.add_all("a b a c a b".split())
+    assert resumen.most_common(2) == [('a', 3), ('b', 2)] and resumen.error('a') == 0
+    resumen.add('d') #Sustituye al mínimo (c, 1) y hereda su cuenta como error
+    assert resumen.most_common(3)[-1] == ('d', 2) and resumen.error('d') == 1
+    # Con un flujo de tipo Zipf: cada cuenta sobreestima la real en como mucho error * total,
+    # nunca la subestima, y toda palabra con más de error * total apariciones está en el resumen
+    error = 0.01
+    aleatorio = random.Random(0)
+    palabras = aleatorio.choices([f"p{i}" for i in range(2000)], [1 / (i + 1) for i in range(2000)], k=50000)
+    resumen = SpaceSaving.of(error)
+    resumen.add_all(palabras)
+    reales = Counter(palabras)
+    assert len(resumen._contadores) <= resumen.capacidad and resumen.total == len(palabras)
+    for palabra, cuenta in resumen._contadores.items():
+        assert reales[palabra] <= cuenta <= reales[palabra] + error * resumen.total, palabra
+        assert cuenta - resumen.error(palabra) <= reales[palabra]
+    assert all(palabra in resumen._contadores for palabra, cuenta in reales.items() if cuenta > error * len(palabras))
+    assert [p for p, _ in mas_comunes_aprox(["a b a", "c a b"], 2, 0.5)] == ['a', 'b']
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_space_saving()
+    benchmark_paralelo()
@@ -0,0 +1,113 @@
+from csv import reader
+from typing import Iterator, List, Optional
+from time import perf_counter
+import os
+import re
+import sys
+
+if __package__ in (None, ''):
+    # Ejecutado como script (python tokenizador.py): src tiene que estar en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from texto.bloques import bloques_texto
+
+_PALABRA = re.compile(r'\w+')
+_NO_ESPACIO = re.compile(r'\S+')
+_NO_PALABRA = re.compile(r'[^\w\s]')
+
+#TOKENIZADOR
+def tokens(texto: str, minusculas: bool = False, puntuacion: bool = False,
+           separador: Optional[str] = None) -> Iterator[str]:
+    '''
+    Devuelve un iterador perezoso con las palabras de texto: no se copia el
+    texto entero, cada palabra se crea al pedirla. Es más lento que palabras
+    (ver benchmark_tokenizador); sirve para textos que no caben en memoria
+    o cuando solo se consumen las primeras palabras.
+    - minusculas: pasa cada palabra a minúsculas.
+    - puntuacion: si es False los signos de puntuación actúan como separadores.
+    - separador: si se indica, se separa solo por esa cadena (como un csv) y se ignoran los campos vacíos.
+    '''
+    if separador is not None:
+        palabras = _campos(texto, separador)
+    else:
+        palabras = map(re.Match.group, (_NO_ESPACIO if puntuacion else _PALABRA).finditer(texto))
+    return map(str.lower, palabras) if minusculas else palabras
+
+def palabras(texto: str, minusculas: bool = False, puntuacion: bool = False,
+             separador: Optional[str] = None) -> List[str]:
+    # Las mismas palabras que tokens, en una lista creada de golpe con re.sub + split.
+    # Para bloques de tamaño acotado (bloques_texto, líneas), donde es lo más rápido
+    if separador is not None:
+        campos = [campo for campo in texto.split(separador) if campo]
+        return [campo.lower() for campo in campos] if minusculas else campos
+    if not puntuacion:
+        texto = _NO_PALABRA.sub(' ', texto)
+    if minusculas:
+        texto = texto.lower()
+    return texto.split()
+
+def _campos(texto: str, separador: str) -> Iterator[str]:
+    # Equivale a filter(None, texto.split(separador)) sin crear la lista
+    if not separador:
+        raise ValueError("separador vacío")
+    inicio = 0
+    while True:
+        fin = texto.find(separador, inicio)
+        if fin < 0:
+            break
+        if fin > inicio:
+            yield texto[inicio:fin]
+        inicio = fin + len(separador)
+    if inicio < len(texto):
+        yield texto[inicio:]
+
+def tokens_fichero(fichero: str, minusculas: bool = False, puntuacion: bool = False,
+                   separador: Optional[str] = None) -> Iterator[str]:
+    # Con separador se lee por líneas (un campo nunca cruza de línea);
+    # sin él se lee en bloques alineados a espacios, con memoria constante
+    if separador is not None:
+        with open(fichero, encoding='utf-8') as f:
+            for linea in f:
+                yield from palabras(linea.rstrip('\r\n'), minusculas, puntuacion, separador)
+    else:
+        for bloque in bloques_texto(fichero):
+            yield from palabras(bloque, minusculas, puntuacion)
+
+
+#BENCHMARK
+def _medir(nombre: str, funcion) -> None:
+    inicio = perf_counter()
+    n = sum(1 for _ in funcion())
+    tiempo = perf_counter() - inicio
+    print(f"{nombre:<32} {n:>10} tokens {n / tiempo:>14,.0f} tokens/s")
+
+def benchmark_tokenizador(fichero: str = '../../resources/lin_quijote.txt', repeticiones: int = 2000) -> None:
+    with open(fichero, encoding='utf-8') as f:
+        texto = f.read() * repeticiones
+    lineas = texto.splitlines()
+    print(f"Benchmark del tokenizador sobre {len(texto)} caracteres")
+    _medir("re.sub + split (anterior)", lambda: re.sub(r'[^\w\s]', ' ', texto.lower()).split())
+    _medir("csv.reader delimiter=' '", lambda: (y for n in reader(lineas, delimiter=' ') for y in n if y != ''))
+    _medir("palabras(minusculas=True)", lambda: palabras(texto, minusculas=True))
+    _medir("tokens(minusculas=True) perezoso", lambda: tokens(texto, minusculas=True))
+    _medir("tokens(separador=' ')", lambda: (t for linea in lineas for t in tokens(linea, separador=' ')))
+
+
+#TESTS
+def test_tokens():
+    print("Pruebas de tokens")
+    assert list(tokens("Hola, mundo! ¿Qué tal?", minusculas=True)) == ['hola', 'mundo', 'qué', 'tal']
+    assert list(tokens("Hola, mundo!", puntuacion=True)) == ['Hola,', 'mundo!']
+    assert list(tokens("a,,b,c", separador=',')) == ['a', 'b', 'c']
+    assert list(tokens(",a::b::,c", separador='::')) == [',a', 'b', ',c']
+    assert list(tokens("Don Quijote, de la Mancha.")) == ['Don', 'Quijote', 'de', 'la', 'Mancha']
+    for texto in ("Hola, mundo! ¿Qué tal?", "İstanbul; a-b_c  d\te", ",a::b::,c"):
+        for opciones in ({}, {'minusculas': True}, {'puntuacion': True}, {'separador': '::', 'minusculas': True}):
+            assert palabras(texto, **opciones) == list(tokens(texto, **opciones)), (texto, opciones)
+    iterador = tokens("uno dos " * 1000)
+    assert iter(iterador) is iterador and next(iterador) == 'uno'
+    print("Pruebas superadas exitosamente.")
+
+if __name__ == '__main__':
+    test_tokens()
+    benchmark_tokenizador()